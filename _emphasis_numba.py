@@ -0,0 +1,184 @@
+"""
+Numba Emphasis Scanning Module
+
+This module provides a JIT-compiled version of the emphasis marker scan used
+by EnhancedFormatter. Numba is optional; when it (or NumPy) is not installed
+HAVE_NUMBA is False and callers should use the pure Python tokenizer.
+"""
+
+try:
+    import numpy as np
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+# Emphasis kinds by the id the scanner writes into its span array
+EMPHASIS_KINDS = ('triple', 'bold', 'italic', 'ubold', 'uitalic', 'strike', 'code', 'highlight')
+
+# Code points of the marker characters
+_STAR = 42        # *
+_UNDERSCORE = 95  # _
+_TILDE = 126      # ~
+_BACKTICK = 96    # `
+_EQUALS = 61      # =
+_NEWLINE = 10     # \n
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _find_paired_close(codes, pos, char, width):
+        """
+        Find the closing marker of a paired emphasis opened at pos.
+
+        Args:
+            codes (np.ndarray): uint32 code points of the text
+            pos (int): Index of the opening marker
+            char (int): Marker character
+            width (int): Marker length (2 or 3)
+
+        Returns:
+            int: Index of the closing marker, or -1 if there is no opening
+                marker at pos or it is not closed on the same line
+        """
+        n = codes.shape[0]
+        if pos + width > n:
+            return -1
+        for i in range(width):
+            if codes[pos + i] != char:
+                return -1
+
+        q = pos + width
+        while q + width <= n:
+            if codes[q] == _NEWLINE:
+                return -1
+            closed = True
+            for i in range(width):
+                if codes[q + i] != char:
+                    closed = False
+                    break
+            if closed:
+                return q
+            q += 1
+        return -1
+
+    @njit(cache=True)
+    def _find_single_close(codes, pos, char):
+        """
+        Find the closing marker of a single-character emphasis opened at pos.
+
+        Args:
+            codes (np.ndarray): uint32 code points of the text
+            pos (int): Index of the opening marker
+            char (int): Marker character
+
+        Returns:
+            int: Index of the closing marker, or -1 if the emphasis is empty,
+                spans a blank line or is not closed
+        """
+        n = codes.shape[0]
+        q = pos + 1
+        while q < n and codes[q] != char:
+            q += 1
+        if q >= n or q == pos + 1:
+            return -1
+
+        # No blank line between the markers
+        for i in range(pos + 1, q - 1):
+            if codes[i] == _NEWLINE and codes[i + 1] == _NEWLINE:
+                return -1
+
+        # * and _ must not be followed by another marker character
+        if char != _BACKTICK and q + 1 < n and codes[q + 1] == char:
+            return -1
+        return q
+
+    @njit(cache=True)
+    def scan_emphasis(codes, spans):
+        """
+        Scan code points for emphasis markers, mirroring _emphasis_spans.
+
+        Args:
+            codes (np.ndarray): uint32 code points of the text
+            spans (np.ndarray): Preallocated int32 array of shape (N, 4), N >= len(codes) // 2 + 1
+
+        Returns:
+            int: Number of rows written to spans as (start, end, kind id, marker width)
+        """
+        n = codes.shape[0]
+        count = 0
+        pos = 0
+
+        while pos < n:
+            char = codes[pos]
+            kind = -1
+            width = 0
+            close = -1
+
+            if char == _STAR:
+                close = _find_paired_close(codes, pos, char, 3)
+                if close != -1:
+                    kind, width = 0, 3
+                else:
+                    close = _find_paired_close(codes, pos, char, 2)
+                    if close != -1:
+                        kind, width = 1, 2
+            elif char == _UNDERSCORE:
+                close = _find_paired_close(codes, pos, char, 2)
+                if close != -1:
+                    kind, width = 3, 2
+            elif char == _TILDE:
+                close = _find_paired_close(codes, pos, char, 2)
+                if close != -1:
+                    kind, width = 5, 2
+            elif char == _EQUALS:
+                close = _find_paired_close(codes, pos, char, 2)
+                if close != -1:
+                    kind, width = 7, 2
+
+            if kind == -1 and (char == _STAR or char == _UNDERSCORE or char == _BACKTICK):
+                if char == _BACKTICK or pos == 0 or codes[pos - 1] != char:
+                    close = _find_single_close(codes, pos, char)
+                    if close != -1:
+                        width = 1
+                        if char == _STAR:
+                            kind = 2
+                        elif char == _UNDERSCORE:
+                            kind = 4
+                        else:
+                            kind = 6
+
+            if kind == -1:
+                pos += 1
+                continue
+
+            spans[count, 0] = pos
+            spans[count, 1] = close + width
+            spans[count, 2] = kind
+            spans[count, 3] = width
+            count += 1
+            pos = close + width
+
+        return count
+
+    def emphasis_spans(text):
+        """
+        Find the emphasis markers in text with the compiled scanner.
+
+        The text is viewed as UTF-32 code points so span indices match str
+        indices.
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            list: (start, end, kind, marker width) of each emphasis
+        """
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        spans = np.empty((codes.shape[0] // 2 + 1, 4), dtype=np.int32)
+        count = scan_emphasis(codes, spans)
+        return [(start, end, EMPHASIS_KINDS[kind], width)
+                for start, end, kind, width in spans[:count].tolist()]
+else:
+    emphasis_spans = None
@@ -0,0 +1,93 @@
+"""
+Numba Distance Filtering Module
+
+This module provides a JIT-compiled version of the dynamic distance filtering
+used by ChromaDBManager. Numba is optional; when it is not installed
+HAVE_NUMBA is False and callers should use the pure Python/NumPy implementation.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def dynamic_distance_filter(distances, base_threshold, threshold_ratio, min_results):
+        """
+        Select which results to keep using the base, ratio and adaptive strategies.
+
+        Every strategy keeps a prefix of the distance-sorted indices, so each one is
+        reduced to a prefix length and the chosen length is sliced off at the end.
+
+        Args:
+            distances (np.ndarray): float64 distances from a ChromaDB query
+            base_threshold (float): BASE_DISTANCE_THRESHOLD
+            threshold_ratio (float): DYNAMIC_THRESHOLD_RATIO
+            min_results (int): MIN_RESULTS_FOR_FILTERING
+
+        Returns:
+            np.ndarray: Indices of results to keep, sorted by distance (best first)
+        """
+        n = distances.shape[0]
+        sorted_indices = np.argsort(distances, kind='mergesort')
+
+        if n == 0 or n < min_results:
+            return sorted_indices
+
+        sorted_distances = distances[sorted_indices]
+        best_distance = sorted_distances[0]
+
+        # Strategy 1: Base threshold filtering
+        base_count = 0
+        while base_count < n and sorted_distances[base_count] <= base_threshold:
+            base_count += 1
+
+        # Strategy 2: Dynamic ratio filtering (relative to best result)
+        dynamic_threshold = best_distance / threshold_ratio
+        ratio_count = 0
+        while ratio_count < n and sorted_distances[ratio_count] <= dynamic_threshold:
+            ratio_count += 1
+
+        # Strategy 3: Adaptive filtering based on the largest gap
+        adaptive_count = n
+        if n >= 3:
+            max_gap = sorted_distances[1] - sorted_distances[0]
+            max_gap_index = 0
+            total_gap = 0.0
+            for i in range(n - 1):
+                gap = sorted_distances[i + 1] - sorted_distances[i]
+                total_gap += gap
+                if gap > max_gap:
+                    max_gap = gap
+                    max_gap_index = i
+            if max_gap > (total_gap / (n - 1)) * 2:
+                adaptive_count = max_gap_index + 1
+
+        # Shortest strategy that keeps enough results, else the most permissive one
+        chosen_count = -1
+        longest_count = 0
+        for count in (base_count, ratio_count, adaptive_count):
+            if count == 0:
+                continue
+            if count > longest_count:
+                longest_count = count
+            if count >= min_results and (chosen_count < 0 or count < chosen_count):
+                chosen_count = count
+
+        if chosen_count < 0:
+            chosen_count = longest_count
+        if chosen_count == 0:
+            # No strategy kept anything
+            chosen_count = min(min_results, n)
+        if chosen_count == 0:
+            # Always return at least the best result
+            chosen_count = 1
+
+        return sorted_indices[:chosen_count]
+else:
+    dynamic_distance_filter = None
@@ -9,11 +9,8 @@ It orchestrates all other modules to provide the complete RAG experience.
 import disable_telemetry
 
 import sys
+import traceback
 from config import config
-from chromadb_manager import ChromaDBManager
-from rag_processor import RAGProcessor
-from enhanced_rag_processor import EnhancedRAGProcessor
-from interactive_commands import InteractiveCommands
 from colors import (
     Colors, print_success, print_error, print_warning, print_info, 
     print_header, print_subheader, colorize
@@ -22,6 +19,10 @@ from colorful_response_formatter import print_colorful_response
 from enhanced_formatting import print_enhanced_response
 
 
+# Static interactive-mode messages, colorized once at import
+GOODBYE_MESSAGE = colorize("\n\n👋 Exiting interactive mode. Goodbye!", Colors.BRIGHT_CYAN)
+
+
 class RAGApplication:
     """Main RAG application class that orchestrates all components."""
     
@@ -31,6 +32,7 @@ class RAGApplication:
         self.rag_processor = None
         self.commands = None
         self.initialized = False
+        self._prompt = colorize("\n💬 Your query: ", Colors.BRIGHT_WHITE, Colors.BOLD)
     
     def initialize(self) -> bool:
         """
@@ -46,6 +48,12 @@ class RAGApplication:
             
             print_info("Initializing ChromaDB client...")
             
+            # Imported here so chromadb and sentence-transformers are only loaded
+            # when the application is actually initialized
+            from chromadb_manager import ChromaDBManager
+            from enhanced_rag_processor import EnhancedRAGProcessor
+            from interactive_commands import InteractiveCommands
+            
             # Initialize ChromaDB manager
             self.chromadb_manager = ChromaDBManager()
             if not self.chromadb_manager.initialize_client():
@@ -53,6 +61,8 @@ class RAGApplication:
             
             # Initialize RAG processor (use enhanced version for better formatting)
             self.rag_processor = EnhancedRAGProcessor(self.chromadb_manager)
+            if config.PREWARM_MODELS:
+                self.rag_processor.prewarm_generation_model()
             
             # Initialize interactive commands
             self.commands = InteractiveCommands(self.chromadb_manager, self.rag_processor)
@@ -77,9 +87,7 @@ class RAGApplication:
         # Main interactive loop
         while True:
             try:
-                # Create colorized prompt
-                prompt_text = colorize("\n💬 Your query: ", Colors.BRIGHT_WHITE, Colors.BOLD)
-                user_input = input(prompt_text).strip()
+                user_input = input(self._prompt).strip()
                 
                 # Handle empty input
                 if not user_input:
@@ -108,12 +116,11 @@ class RAGApplication:
                 print_enhanced_response(response, user_input)
                 
             except KeyboardInterrupt:
-                print(colorize("\n\n👋 Exiting interactive mode. Goodbye!", Colors.BRIGHT_CYAN))
+                print(GOODBYE_MESSAGE)
                 break
             except Exception as e:
                 print_error(f"Error during interactive session: {e}")
                 if config.DEBUG_MODE:
-                    import traceback
                     traceback.print_exc()
         
         print_info("Script finished.")
@@ -11,12 +11,55 @@ This module handles all ChromaDB operations including:
 import disable_telemetry
 
 import os
+import copy
+import time
+import asyncio
+import itertools
+import threading
+import traceback
 import chromadb
+import numpy as np
+from collections import OrderedDict
 from chromadb.config import Settings
 from datetime import datetime
 from chromadb.utils import embedding_functions
 from config import config
 from colors import print_success, print_error, print_warning, print_info
+from _filter_numba import HAVE_NUMBA, dynamic_distance_filter
+
+
+# Maximum number of query results kept in each manager's query cache
+QUERY_CACHE_MAXSIZE = 128
+
+# Maximum number of query embeddings kept in each manager's embedding cache
+EMBEDDING_CACHE_MAXSIZE = 512
+
+# Persistent clients keyed by database path, so re-initializing a manager reuses the
+# already opened sqlite database and HNSW segments
+_CLIENT_CACHE = {}
+
+# Embedding functions keyed by model name, shared across manager instances so the
+# SentenceTransformer weights are only loaded from disk once per process
+_EF_CACHE = {}
+
+
+def _get_embedding_function(model_name: str):
+    """
+    Get the cached SentenceTransformer embedding function for a model, creating it on first use.
+    
+    Args:
+        model_name (str): Name of the sentence transformer model
+    
+    Returns:
+        SentenceTransformerEmbeddingFunction: Shared embedding function instance
+    """
+    embedding_function = _EF_CACHE.get(model_name)
+    if embedding_function is None:
+        embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=model_name
+        )
+        _EF_CACHE[model_name] = embedding_function
+    return embedding_function
 
 
 class ChromaDBManager:
@@ -34,6 +77,19 @@ class ChromaDBManager:
         self.collection_name = collection_name or config.COLLECTION_NAME
         self.client = None
         self.collection = None
+        self._ef = None
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._emb_cache = OrderedDict()
+        self._emb_cache_lock = threading.Lock()
+        self._cached_count = None
+        # Bumped whenever the collection's contents may have changed
+        self.data_version = 0
+        self._id_counter = itertools.count()
+        self._meta_template = {
+            "content_type": "user_context",
+            "added_via": "chromadb_manager"
+        }
         
     def initialize_client(self) -> bool:
         """
@@ -44,28 +100,30 @@ class ChromaDBManager:
         """
         try:
             # Set environment variable to disable telemetry completely
-            import os
             os.environ['ANONYMIZED_TELEMETRY'] = 'False'
             
-            # Disable telemetry to avoid the capture() error
-            settings = Settings(
-                anonymized_telemetry=False,
-                allow_reset=True,
-                is_persistent=True
-            )
-            
-            self.client = chromadb.PersistentClient(path=self.db_path, settings=settings)
+            self.client = _CLIENT_CACHE.get(self.db_path)
+            if self.client is None:
+                # Disable telemetry to avoid the capture() error
+                settings = Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True,
+                    is_persistent=True
+                )
+                
+                self.client = chromadb.PersistentClient(path=self.db_path, settings=settings)
+                _CLIENT_CACHE[self.db_path] = self.client
             
             # Use sentence transformer embedding function for consistency
-            sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=config.SENTENCE_TRANSFORMER_MODEL
-            )
+            self._ef = _get_embedding_function(config.SENTENCE_TRANSFORMER_MODEL)
             
             # Get or create collection with the same embedding function
             self.collection = self.client.get_or_create_collection(
                 name=self.collection_name,
-                embedding_function=sentence_transformer_ef
+                embedding_function=self._ef
             )
+            self._cached_count = None
+            self.data_version += 1
             
             if config.VERBOSE_LOGGING:
                 print(f"Successfully connected to ChromaDB collection: '{self.collection_name}'")
@@ -87,39 +145,80 @@ class ChromaDBManager:
             text_content (str): The text content to add to ChromaDB
             source_label (str): Label to identify the source of this content
         
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.add_contexts([text_content], [source_label])
+    
+    def add_contexts(self, text_contents: list, source_labels: list = None,
+                     batch_size: int = 500) -> bool:
+        """
+        Adds multiple text contents to ChromaDB collection in batched writes.
+        
+        Args:
+            text_contents (list): Text contents to add to ChromaDB
+            source_labels (list): Source label for each text. Defaults to "user_input" for all.
+            batch_size (int): Maximum number of documents sent per collection.add call
+        
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            if not text_content.strip():
+            if source_labels is None:
+                source_labels = ["user_input"] * len(text_contents)
+            
+            if len(source_labels) != len(text_contents):
+                print("Error: Number of source labels must match number of text contents.")
+                return False
+            
+            # Strip each text once and skip empty entries
+            entries = []
+            for text, label in zip(text_contents, source_labels):
+                stripped = text.strip()
+                if stripped:
+                    entries.append((stripped, label))
+            
+            if not entries:
                 print("Error: Cannot add empty content to ChromaDB.")
                 return False
             
+            if len(entries) < len(text_contents) and config.VERBOSE_LOGGING:
+                print(f"Skipping {len(text_contents) - len(entries)} empty document(s).")
+            
             if not self.collection:
                 print("Error: ChromaDB collection not initialized.")
                 return False
             
-            # Generate a unique ID with timestamp
+            # Human-readable timestamp for metadata; IDs use a nanosecond clock plus a
+            # per-manager counter so they stay unique across calls in the same second
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            doc_id = f"{source_label}_{timestamp}"
-            
-            # Prepare metadata
-            metadata = {
-                "source": source_label,
-                "timestamp": timestamp,
-                "content_type": "user_context",
-                "added_via": "chromadb_manager"
-            }
+            id_prefix = time.time_ns()
             
-            # Add the document to ChromaDB
-            self.collection.add(
-                documents=[text_content.strip()],
-                metadatas=[metadata],
-                ids=[doc_id]
-            )
+            documents = []
+            metadatas = []
+            ids = []
+            for text, source_label in entries:
+                documents.append(text)
+                metadatas.append({**self._meta_template, "source": source_label, "timestamp": timestamp})
+                ids.append(f"{source_label}_{id_prefix}_{next(self._id_counter)}")
+            
+            # Add the documents to ChromaDB in chunks
+            for start in range(0, len(documents), batch_size):
+                end = start + batch_size
+                self.collection.add(
+                    documents=documents[start:end],
+                    metadatas=metadatas[start:end],
+                    ids=ids[start:end]
+                )
+                self._clear_query_cache()
+                if self._cached_count is not None:
+                    self._cached_count += len(ids[start:end])
             
             if config.VERBOSE_LOGGING:
-                print(f"Successfully added context to ChromaDB with ID: {doc_id}")
+                if len(ids) == 1:
+                    print(f"Successfully added context to ChromaDB with ID: {ids[0]}")
+                else:
+                    print(f"Successfully added {len(ids)} documents to ChromaDB.")
             
             return True
             
@@ -140,29 +239,29 @@ class ChromaDBManager:
                 return False
             
             # Get current document count
-            current_count = self.collection.count()
+            current_count = self._count()
             
             if current_count == 0:
                 print("ChromaDB collection is already empty.")
                 return True
             
-            # Get all document IDs and delete them
-            all_docs = self.collection.get()
-            if all_docs and all_docs.get('ids'):
-                self.collection.delete(ids=all_docs['ids'])
-                print(f"✓ Successfully cleared {current_count} document(s) from ChromaDB collection!")
-                
-                if config.VERBOSE_LOGGING:
-                    print(f"Collection '{self.collection.name}' is now empty.")
-                return True
-            else:
-                print("No documents found to delete.")
-                return True
-                
+            # Drop and recreate the collection instead of fetching every ID to delete
+            self.client.delete_collection(self.collection_name)
+            self.collection = self.client.get_or_create_collection(
+                name=self.collection_name,
+                embedding_function=self._ef
+            )
+            self._clear_query_cache()
+            self._cached_count = 0
+            print(f"✓ Successfully cleared {current_count} document(s) from ChromaDB collection!")
+            
+            if config.VERBOSE_LOGGING:
+                print(f"Collection '{self.collection.name}' is now empty.")
+            return True
+            
         except Exception as e:
             print(f"✗ Error clearing ChromaDB collection: {e}")
             if config.DEBUG_MODE:
-                import traceback
                 traceback.print_exc()
             return False
     
@@ -177,7 +276,7 @@ class ChromaDBManager:
             return {"error": "Collection not initialized"}
         
         try:
-            count = self.collection.count()
+            count = self._count()
             return {
                 "name": self.collection_name,
                 "count": count,
@@ -186,6 +285,21 @@ class ChromaDBManager:
         except Exception as e:
             return {"error": f"Failed to get collection info: {e}"}
     
+    def _count(self) -> int:
+        """
+        Get the number of documents in the collection, reusing the last known count.
+        
+        Returns:
+            int: Document count
+        """
+        if self._cached_count is None:
+            self._cached_count = self.collection.count()
+        return self._cached_count
+    
+    def invalidate_count(self):
+        """Forget the cached document count, e.g. after the collection was changed externally."""
+        self._cached_count = None
+    
     def query_collection(self, query_embeddings: list, n_results: int = None) -> dict:
         """
         Query the collection with embeddings.
@@ -212,7 +326,7 @@ class ChromaDBManager:
     
     def query_with_text(self, query_text: str, n_results: int = None) -> dict:
         """
-        Query the collection with text (uses ChromaDB's built-in embedding).
+        Query the collection with text (embedded with the collection's embedding function).
         
         Args:
             query_text (str): Text to query with
@@ -226,15 +340,127 @@ class ChromaDBManager:
         
         try:
             n_results = n_results or config.MAX_RESULTS
+            cache_key = ('text', query_text, n_results)
+            cached = self._get_cached_query(cache_key)
+            if cached is not None:
+                return cached
+            
             results = self.collection.query(
-                query_texts=[query_text],
+                query_embeddings=[self._embed(query_text)],
                 n_results=n_results
             )
+            self._store_cached_query(cache_key, results)
             return results
         except Exception as e:
             return {"error": f"Failed to query collection with text: {e}"}
     
-    def query_with_dynamic_distance_filter(self, query_text: str, n_results: int = None) -> dict:
+    def embed_query(self, text: str):
+        """
+        Embed query text the same way the collection is queried.
+        
+        Args:
+            text (str): Text to embed
+        
+        Returns:
+            Embedding vector for the text, or None if the collection is not initialized
+        """
+        if self._ef is None:
+            return None
+        return self._embed(text)
+    
+    def _embed(self, text: str):
+        """
+        Embed query text with the collection's embedding function, reusing cached vectors.
+        
+        Args:
+            text (str): Text to embed
+        
+        Returns:
+            Embedding vector for the text
+        """
+        with self._emb_cache_lock:
+            embedding = self._emb_cache.get(text)
+            if embedding is not None:
+                self._emb_cache.move_to_end(text)
+                return embedding
+        
+        embedding = self._ef([text])[0]
+        
+        with self._emb_cache_lock:
+            self._emb_cache[text] = embedding
+            self._emb_cache.move_to_end(text)
+            while len(self._emb_cache) > EMBEDDING_CACHE_MAXSIZE:
+                self._emb_cache.popitem(last=False)
+        return embedding
+    
+    def _get_cached_query(self, cache_key: tuple):
+        """
+        Look up a previously stored query result.
+        
+        Args:
+            cache_key (tuple): Key identifying the query
+        
+        Returns:
+            dict: Copy of the cached result, or None on a cache miss
+        """
+        with self._query_cache_lock:
+            cached = self._query_cache.get(cache_key)
+            if cached is None:
+                return None
+            self._query_cache.move_to_end(cache_key)
+        return copy.deepcopy(cached)
+    
+    def _store_cached_query(self, cache_key: tuple, results: dict):
+        """
+        Store a query result, evicting the least recently used entries over the limit.
+        
+        Args:
+            cache_key (tuple): Key identifying the query
+            results (dict): Query result to cache
+        """
+        results = copy.deepcopy(results)
+        with self._query_cache_lock:
+            self._query_cache[cache_key] = results
+            self._query_cache.move_to_end(cache_key)
+            while len(self._query_cache) > QUERY_CACHE_MAXSIZE:
+                self._query_cache.popitem(last=False)
+    
+    def _clear_query_cache(self):
+        """Drop all cached query results after the collection changed."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+        self.data_version += 1
+    
+    async def aquery_with_text(self, query_text: str, n_results: int = None) -> dict:
+        """
+        Async variant of query_with_text that runs the blocking query in a worker thread.
+        
+        Args:
+            query_text (str): Text to query with
+            n_results (int): Number of results to return
+        
+        Returns:
+            dict: Query results from ChromaDB
+        """
+        return await asyncio.to_thread(self.query_with_text, query_text, n_results)
+    
+    async def aquery_with_dynamic_distance_filter(self, query_text: str, n_results: int = None,
+                                                  query_embedding=None) -> dict:
+        """
+        Async variant of query_with_dynamic_distance_filter that runs in a worker thread.
+        
+        Args:
+            query_text (str): Text to query with
+            n_results (int): Desired number of results
+            query_embedding: Embedding of query_text from embed_query, if already computed
+        
+        Returns:
+            dict: Filtered query results with distance information
+        """
+        return await asyncio.to_thread(self.query_with_dynamic_distance_filter, query_text, n_results, query_embedding)
+    
+    def query_with_dynamic_distance_filter(self, query_text: str, n_results: int = None,
+                                           query_embedding=None) -> dict:
         """
         Query with dynamic distance-based filtering for improved accuracy.
         
@@ -246,6 +472,7 @@ class ChromaDBManager:
         Args:
             query_text (str): Text to query with
             n_results (int): Desired number of results
+            query_embedding: Embedding of query_text from embed_query, if already computed
         
         Returns:
             dict: Filtered query results with distance information
@@ -253,19 +480,30 @@ class ChromaDBManager:
         if not self.collection:
             return {"error": "Collection not initialized"}
         
-        if not config.ENABLE_DISTANCE_FILTERING:
-            # Fall back to regular query if filtering is disabled
-            return self.query_with_text(query_text, n_results)
-        
         try:
             n_results = n_results or config.MAX_RESULTS
+            filtering_enabled = config.ENABLE_DISTANCE_FILTERING
             
-            # Query with extra results to allow for filtering
-            query_size = max(n_results * 3, config.MIN_RESULTS_FOR_FILTERING * 2)
-            raw_results = self.collection.query(
-                query_texts=[query_text],
-                n_results=query_size
-            )
+            # Unfiltered queries share query_with_text's cache entries
+            cache_key = ('filtered' if filtering_enabled else 'text', query_text, n_results)
+            cached = self._get_cached_query(cache_key)
+            if cached is not None:
+                return cached
+            
+            if query_embedding is None:
+                query_embedding = self._embed(query_text)
+            
+            if not filtering_enabled:
+                # Regular query if filtering is disabled
+                results = self.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=n_results
+                )
+                self._store_cached_query(cache_key, results)
+                return results
+            
+            # Query with only as many extra results as filtering turns out to need
+            raw_results = self._query_adaptive(query_embedding, n_results)
             
             if not raw_results.get('distances') or not raw_results['distances'][0]:
                 if config.DISTANCE_DEBUG_MODE:
@@ -282,17 +520,20 @@ class ChromaDBManager:
                     print_warning("Empty distance list in query results")
                 return raw_results
             
+            # Vectorize distances once; lists are only rebuilt when assembling results
+            d = np.asarray(distances, dtype=np.float64)
+            best_distance = float(d.min())
+            
             # Apply hard distance threshold first (absolute cutoff)
-            hard_filtered_indices = [i for i, dist in enumerate(distances) 
-                                   if dist <= config.HARD_DISTANCE_THRESHOLD]
+            hard_filtered_indices = np.nonzero(d <= config.HARD_DISTANCE_THRESHOLD)[0]
             
-            if not hard_filtered_indices:
+            if hard_filtered_indices.size == 0:
                 # No results pass the hard threshold - return empty results
                 if config.DISTANCE_DEBUG_MODE:
                     print_warning(f"No results passed hard distance threshold of {config.HARD_DISTANCE_THRESHOLD}")
-                    print_warning(f"Best available distance was: {min(distances):.4f}")
+                    print_warning(f"Best available distance was: {best_distance:.4f}")
                 
-                return {
+                rejected_results = {
                     'documents': [[]],
                     'metadatas': [[]],
                     'distances': [[]],
@@ -303,25 +544,21 @@ class ChromaDBManager:
                         'filtering_enabled': True,
                         'hard_threshold_applied': True,
                         'hard_threshold_value': config.HARD_DISTANCE_THRESHOLD,
-                        'best_distance': min(distances) if distances else None,
+                        'best_distance': best_distance,
                         'rejected_by_hard_threshold': True
                     }
                 }
+                self._store_cached_query(cache_key, rejected_results)
+                return rejected_results
             
-            # Filter the original data to only include results that passed hard threshold
-            hard_filtered_distances = [distances[i] for i in hard_filtered_indices]
-            hard_filtered_documents = [documents[i] for i in hard_filtered_indices] if documents else []
-            hard_filtered_metadatas = [metadatas[i] for i in hard_filtered_indices] if metadatas else []
-            hard_filtered_ids = [ids[i] for i in hard_filtered_indices] if ids else []
-            
-            # Apply dynamic distance filtering to the hard-filtered results
-            relative_filtered_indices = self._apply_dynamic_distance_filtering(hard_filtered_distances, query_text)
+            # Apply dynamic distance filtering to the distances that passed hard threshold
+            relative_filtered_indices = self._apply_dynamic_distance_filtering(d[hard_filtered_indices], query_text)
             
             # Convert relative indices back to original indices
-            filtered_indices = [hard_filtered_indices[i] for i in relative_filtered_indices]
+            filtered_indices_arr = hard_filtered_indices[relative_filtered_indices][:n_results]
             
             # Limit to requested number of results
-            filtered_indices = filtered_indices[:n_results]
+            filtered_indices = filtered_indices_arr.tolist()
             
             # Build filtered results
             filtered_results = {
@@ -336,101 +573,164 @@ class ChromaDBManager:
                     'hard_threshold_applied': True,
                     'hard_threshold_value': config.HARD_DISTANCE_THRESHOLD,
                     'hard_threshold_passed': len(hard_filtered_indices),
-                    'best_distance': min(distances) if distances else None,
-                    'worst_accepted_distance': max([distances[i] for i in filtered_indices]) if filtered_indices else None
+                    'best_distance': best_distance,
+                    'worst_accepted_distance': float(d[filtered_indices_arr].max()) if filtered_indices else None
                 }
             }
             
             if config.DISTANCE_DEBUG_MODE:
                 self._print_distance_debug_info(distances, filtered_indices, query_text)
             
+            self._store_cached_query(cache_key, filtered_results)
             return filtered_results
             
         except Exception as e:
             print_error(f"Error in dynamic distance filtering: {e}")
             if config.DEBUG_MODE:
-                import traceback
                 traceback.print_exc()
             # Fall back to regular query on error
             return self.query_with_text(query_text, n_results)
     
-    def _apply_dynamic_distance_filtering(self, distances: list, query_text: str = "") -> list:
+    def _query_adaptive(self, query_embedding, n_results: int) -> dict:
+        """
+        Query with progressively larger result counts until enough results pass the hard threshold.
+        
+        Starts with n_results and escalates to 3x and then 6x (never less than twice
+        MIN_RESULTS_FOR_FILTERING) only when the hard threshold removed too many results.
+        
+        Args:
+            query_embedding: Embedding of the query text
+            n_results (int): Desired number of results
+        
+        Returns:
+            dict: Raw query results from the last probe
+        """
+        probe_sizes = [n_results]
+        for factor in (3, 6):
+            size = max(n_results * factor, config.MIN_RESULTS_FOR_FILTERING * 2)
+            if size > probe_sizes[-1]:
+                probe_sizes.append(size)
+        
+        raw_results = None
+        for query_size in probe_sizes:
+            raw_results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=query_size
+            )
+            distances = raw_results['distances'][0] if raw_results.get('distances') else []
+            
+            # The collection has no more results to offer
+            if len(distances) < query_size:
+                break
+            
+            passed = int(np.count_nonzero(np.asarray(distances) <= config.HARD_DISTANCE_THRESHOLD))
+            if passed >= n_results:
+                break
+        
+        return raw_results
+    
+    def _apply_dynamic_distance_filtering(self, distances, query_text: str = "") -> list:
         """
         Apply dynamic distance filtering logic to determine which results to keep.
         
         Args:
-            distances (list): List of distances from ChromaDB query
+            distances (list | np.ndarray): Distances from ChromaDB query
             query_text (str): Original query text for context
         
         Returns:
             list: Indices of results to keep, sorted by distance (best first)
         """
-        if not distances:
+        d = np.asarray(distances, dtype=np.float64)
+        if d.size == 0:
             return []
         
-        # Sort indices by distance (best/lowest first)
-        sorted_indices = sorted(range(len(distances)), key=lambda i: distances[i])
+        if HAVE_NUMBA:
+            # Same strategies and selection, compiled into a single pass
+            return dynamic_distance_filter(
+                d,
+                float(config.BASE_DISTANCE_THRESHOLD),
+                float(config.DYNAMIC_THRESHOLD_RATIO),
+                int(config.MIN_RESULTS_FOR_FILTERING)
+            ).tolist()
         
-        if len(distances) < config.MIN_RESULTS_FOR_FILTERING:
+        # Sort indices by distance (best/lowest first); stable to keep ties in query order
+        sorted_indices = np.argsort(d, kind='stable')
+        
+        if d.size < config.MIN_RESULTS_FOR_FILTERING:
             # Not enough results for meaningful filtering
-            return sorted_indices
+            return sorted_indices.tolist()
         
-        best_distance = distances[sorted_indices[0]]
+        sorted_distances = d[sorted_indices]
+        best_distance = sorted_distances[0]
         
         # Strategy 1: Base threshold filtering
-        base_filtered = [i for i in sorted_indices 
-                        if distances[i] <= config.BASE_DISTANCE_THRESHOLD]
+        base_filtered = sorted_indices[sorted_distances <= config.BASE_DISTANCE_THRESHOLD].tolist()
         
         # Strategy 2: Dynamic ratio filtering (relative to best result)
         dynamic_threshold = best_distance / config.DYNAMIC_THRESHOLD_RATIO
-        ratio_filtered = [i for i in sorted_indices 
-                         if distances[i] <= dynamic_threshold]
+        ratio_filtered = sorted_indices[sorted_distances <= dynamic_threshold].tolist()
         
         # Strategy 3: Adaptive filtering based on result quality
-        adaptive_filtered = self._apply_adaptive_filtering(distances, sorted_indices, best_distance)
+        adaptive_filtered = self._apply_adaptive_filtering(d, sorted_indices, best_distance)
         
         # Combine strategies: use the most restrictive that still gives reasonable results
         candidates = [base_filtered, ratio_filtered, adaptive_filtered]
         
         # Choose the filtering strategy that provides the best balance
-        chosen_filtered = self._choose_best_filtering_strategy(candidates, distances, sorted_indices)
+        sorted_list = sorted_indices.tolist()
+        chosen_filtered = self._choose_best_filtering_strategy(candidates, distances, sorted_list)
         
-        return chosen_filtered if chosen_filtered else sorted_indices[:1]  # Always return at least the best result
+        return chosen_filtered if chosen_filtered else sorted_list[:1]  # Always return at least the best result
     
-    def _apply_adaptive_filtering(self, distances: list, sorted_indices: list, best_distance: float) -> list:
+    def _apply_adaptive_filtering(self, distances, sorted_indices, best_distance: float) -> list:
         """
         Apply adaptive filtering based on the distribution of distances.
         
         Args:
-            distances (list): List of distances
-            sorted_indices (list): Indices sorted by distance
+            distances (list | np.ndarray): Distances
+            sorted_indices (list | np.ndarray): Indices sorted by distance
             best_distance (float): The best (lowest) distance
         
         Returns:
             list: Filtered indices
         """
-        if len(sorted_indices) < 3:
-            return sorted_indices
+        n = len(sorted_indices)
+        if n < 3:
+            return list(map(int, sorted_indices))
+        
+        if n <= 5:
+            # Small result sets (the common case) are cheaper in plain Python than
+            # setting up NumPy arrays: walk the few gaps once, tracking max and sum
+            indices = list(map(int, sorted_indices))
+            sorted_distances = [float(distances[i]) for i in indices]
+            max_gap = sorted_distances[1] - sorted_distances[0]
+            max_gap_index = 0
+            total_gap = max_gap
+            for i in range(1, n - 1):
+                gap = sorted_distances[i + 1] - sorted_distances[i]
+                total_gap += gap
+                if gap > max_gap:
+                    max_gap = gap
+                    max_gap_index = i
+            
+            if max_gap > (total_gap / (n - 1)) * 2:  # Gap is more than 2x average
+                return indices[:max_gap_index + 1]
+            return indices
         
-        # Calculate distance gaps between consecutive results
-        gaps = []
-        for i in range(len(sorted_indices) - 1):
-            current_dist = distances[sorted_indices[i]]
-            next_dist = distances[sorted_indices[i + 1]]
-            gaps.append(next_dist - current_dist)
+        sorted_indices = np.asarray(sorted_indices, dtype=np.intp)
         
-        if not gaps:
-            return sorted_indices
+        # Calculate distance gaps between consecutive results
+        gaps = np.diff(np.asarray(distances, dtype=np.float64)[sorted_indices])
         
         # Find the largest gap (indicates a quality drop)
-        max_gap_index = gaps.index(max(gaps))
+        max_gap_index = int(gaps.argmax())
         
         # If the largest gap is significant, cut off after it
-        avg_gap = sum(gaps) / len(gaps)
+        avg_gap = gaps.mean()
         if gaps[max_gap_index] > avg_gap * 2:  # Gap is more than 2x average
-            return sorted_indices[:max_gap_index + 1]
+            return sorted_indices[:max_gap_index + 1].tolist()
         
-        return sorted_indices
+        return sorted_indices.tolist()
     
     def _choose_best_filtering_strategy(self, candidates: list, distances: list, sorted_indices: list) -> list:
         """
@@ -444,20 +744,25 @@ class ChromaDBManager:
         Returns:
             list: Best filtered indices
         """
-        # Remove empty candidates
-        valid_candidates = [c for c in candidates if c]
-        
-        if not valid_candidates:
-            return sorted_indices[:config.MIN_RESULTS_FOR_FILTERING]
-        
-        # Prefer the strategy that keeps at least MIN_RESULTS_FOR_FILTERING results
-        # but isn't too permissive
-        for candidate in sorted(valid_candidates, key=len):
-            if len(candidate) >= config.MIN_RESULTS_FOR_FILTERING:
-                return candidate
-        
-        # If no strategy meets the minimum, use the one with the most results
-        return max(valid_candidates, key=len)
+        min_results = config.MIN_RESULTS_FOR_FILTERING
+        shortest_ok = None
+        longest = None
+        
+        # Single pass over the non-empty candidates: prefer the strategy that keeps at
+        # least MIN_RESULTS_FOR_FILTERING results but isn't too permissive, and track
+        # the one with the most results as a fallback
+        for candidate in candidates:
+            if not candidate:
+                continue
+            if longest is None or len(candidate) > len(longest):
+                longest = candidate
+            if len(candidate) >= min_results and (shortest_ok is None or len(candidate) < len(shortest_ok)):
+                shortest_ok = candidate
+        
+        if longest is None:
+            return sorted_indices[:min_results]
+        
+        return shortest_ok if shortest_ok is not None else longest
     
     def _print_distance_debug_info(self, distances: list, filtered_indices: list, query_text: str):
         """Print debug information about distance filtering."""
@@ -6,14 +6,115 @@ making them more visually appealing and easier to read.
 """
 
 import re
-from typing import List, Tuple
+from typing import Callable, Dict, Iterator, List, Match, Optional, Tuple, cast
 from colors import Colors, ColorPrinter, colorize
 
 
+# ANSI codes bound to module names once so the formatting hot paths skip
+# the Colors attribute lookups
+_BG_YELLOW = Colors.BG_YELLOW
+_BLACK = Colors.BLACK
+_BLUE = Colors.BLUE
+_BOLD = Colors.BOLD
+_BRIGHT_BLACK = Colors.BRIGHT_BLACK
+_BRIGHT_BLUE = Colors.BRIGHT_BLUE
+_BRIGHT_CYAN = Colors.BRIGHT_CYAN
+_BRIGHT_GREEN = Colors.BRIGHT_GREEN
+_BRIGHT_MAGENTA = Colors.BRIGHT_MAGENTA
+_BRIGHT_WHITE = Colors.BRIGHT_WHITE
+_BRIGHT_YELLOW = Colors.BRIGHT_YELLOW
+_CYAN = Colors.CYAN
+_DIM = Colors.DIM
+_ITALIC = Colors.ITALIC
+_RESET = Colors.RESET
+_STRIKETHROUGH = Colors.STRIKETHROUGH
+_UNDERLINE = Colors.UNDERLINE
+_WHITE = Colors.WHITE
+
+# Keywords highlighted in regular paragraphs
+HIGHLIGHT_KEYWORDS = (
+    # Technical terms
+    'API', 'database', 'server', 'client', 'HTTP', 'HTTPS', 'JSON', 'XML',
+    'Python', 'JavaScript', 'SQL', 'HTML', 'CSS', 'React', 'Node.js',
+    
+    # Important concepts
+    'important', 'note', 'warning', 'error', 'success', 'failed', 'completed',
+    'required', 'optional', 'recommended', 'deprecated',
+    
+    # Action words
+    'install', 'configure', 'setup', 'deploy', 'build', 'test', 'debug',
+    'create', 'update', 'delete', 'modify', 'execute', 'run',
+    
+    # Status words
+    'active', 'inactive', 'enabled', 'disabled', 'online', 'offline'
+)
+
+# Emphasis markers as (name, pattern) pairs; earlier entries take precedence
+# (triple before bold before italic) when fused into one alternation below
+_EMPHASIS_PATTERNS = (
+    ('triple', r'\*\*\*(.*?)\*\*\*'),
+    ('bold', r'\*\*(.*?)\*\*'),
+    ('italic', r'(?<!\*)\*([^*]+?)\*(?!\*)'),
+    ('underline_bold', r'__(.*?)__'),
+    ('underline_italic', r'(?<!_)_([^_]+?)_(?!_)'),
+    ('strikethrough', r'~~(.*?)~~'),
+    ('code', r'`([^`]+?)`'),
+    ('highlight', r'==(.*?)=='),
+)
+
+# Combined ANSI prefixes for each emphasis kind, so each match is wrapped with a
+# single color argument instead of assembling color and style separately
+_EMPHASIS_STYLES = {
+    'triple': _BRIGHT_YELLOW + _BOLD + _ITALIC,
+    'bold': _BOLD + _BRIGHT_WHITE,
+    'italic': _ITALIC + _BRIGHT_CYAN,
+    'underline_bold': _BRIGHT_MAGENTA + _BOLD + _UNDERLINE,
+    'underline_italic': _CYAN + _ITALIC + _UNDERLINE,
+    'strikethrough': _STRIKETHROUGH + _BRIGHT_BLACK,
+    'code': _BOLD + _BRIGHT_GREEN,
+    'highlight': _BOLD + _BLACK + _BG_YELLOW,
+}
+
+# Regex patterns compiled once at import instead of on every formatted paragraph.
+# All emphasis markers are matched in a single left-to-right pass.
+_EMPHASIS_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in _EMPHASIS_PATTERNS))
+
+# Group number holding the marked-up text for each emphasis kind
+_EMPHASIS_CONTENT_GROUP = {name: _EMPHASIS_RE.groupindex[name] + 1 for name, _ in _EMPHASIS_PATTERNS}
+
+# Whole-word, case-insensitive keyword match; longest keywords first so e.g.
+# HTTPS beats HTTP
+_KEYWORD_PATTERN = r'\b(?i:' + '|'.join(re.escape(k) for k in sorted(HIGHLIGHT_KEYWORDS, key=len, reverse=True)) + r')\b'
+
+# URLs, file paths, keywords and numbers resolved in one left-to-right pass.
+# URLs come first so the keywords, paths and digits inside them are not
+# highlighted separately.
+_HIGHLIGHT_RE = re.compile(
+    r'(?P<url>https?://[^\s<>"{}|\\^`\[\]]+)'
+    r'|(?P<path>[/\\][\w\-_./\\]+)'
+    r'|(?P<keyword>' + _KEYWORD_PATTERN + r')'
+    r'|(?P<number>\b\d+\b)'
+)
+_HIGHLIGHT_STYLES = {
+    'url': _UNDERLINE + _BRIGHT_BLUE,
+    'path': _BRIGHT_MAGENTA,
+    'keyword': _BRIGHT_YELLOW,
+    'number': _BRIGHT_CYAN,
+}
+_LIST_NUMBER_RE = re.compile(r'^(\d+\.)')
+
+# Anything that could make a paragraph more than plain prose: list, heading,
+# emphasis and code markers, digits, paths/URLs or a highlighted keyword
+_NEEDS_FORMATTING = re.compile(r'[*_`#\-•\d/\\]|' + _KEYWORD_PATTERN).search
+
+# Any of these characters marks a paragraph for emphasis formatting
+_HAS_EMPHASIS = re.compile(r'[*_`]').search
+
+
 class ColorfulResponseFormatter:
     """Formats AI responses with beautiful colors and styling."""
     
-    def __init__(self, enable_colors: bool = None):
+    def __init__(self, enable_colors: Optional[bool] = None) -> None:
         """
         Initialize the colorful response formatter.
         
@@ -21,8 +122,16 @@ class ColorfulResponseFormatter:
             enable_colors (bool): Whether to enable colors. Auto-detect if None.
         """
         self.color_printer = ColorPrinter(enable_colors)
+        self.colors_enabled = self.color_printer.colors_enabled
+        self._colorize = self.color_printer.colorize
+        self._paragraph_formatters: Dict[str, Callable[[str], str]] = {
+            'list': self._format_list_item,
+            'code': self._format_code_block,
+            'heading': self._format_heading,
+            'emphasis': self._format_emphasized_text
+        }
     
-    def format_response(self, response: str, query: str = None) -> str:
+    def format_response(self, response: str, query: Optional[str] = None) -> str:
         """
         Format an AI response with beautiful colors and styling.
         
@@ -33,71 +142,104 @@ class ColorfulResponseFormatter:
         Returns:
             str: Beautifully formatted response
         """
-        if not response.strip():
-            return colorize("No response generated.", Colors.BRIGHT_BLACK)
+        text = response.strip()
+        if not text:
+            return self._colorize("No response generated.", _BRIGHT_BLACK)
         
-        # Split response into paragraphs
-        paragraphs = [p.strip() for p in response.split('\n\n') if p.strip()]
-        formatted_paragraphs = []
+        # Fast path: a single paragraph of plain prose is just colored as a whole
+        if '\n\n' not in text and _NEEDS_FORMATTING(text) is None and not self._is_heading(text):
+            return self._colorize(text, _BRIGHT_WHITE)
         
-        for i, paragraph in enumerate(paragraphs):
-            formatted_paragraph = self._format_paragraph(paragraph, i == 0)
-            formatted_paragraphs.append(formatted_paragraph)
+        return '\n\n'.join(self._iter_formatted_paragraphs(response))
+    
+    def _iter_formatted_paragraphs(self, response: str) -> Iterator[str]:
+        """
+        Split a response into paragraphs and format them one at a time.
         
-        return '\n\n'.join(formatted_paragraphs)
+        Args:
+            response (str): The AI response to format
+            
+        Yields:
+            str: Each non-empty paragraph, stripped once and formatted
+        """
+        is_first = True
+        for paragraph in response.split('\n\n'):
+            paragraph = paragraph.strip()
+            if paragraph:
+                yield self._format_paragraph(paragraph, is_first)
+                is_first = False
     
     def _format_paragraph(self, paragraph: str, is_first: bool = False) -> str:
         """
         Format a single paragraph with colors.
         
         Args:
-            paragraph (str): Paragraph to format
+            paragraph (str): Paragraph to format, already stripped
             is_first (bool): Whether this is the first paragraph
             
         Returns:
             str: Formatted paragraph
         """
         # Handle different types of content
-        if self._is_list_item(paragraph):
-            return self._format_list_item(paragraph)
-        elif self._is_code_block(paragraph):
-            return self._format_code_block(paragraph)
-        elif self._is_heading(paragraph):
-            return self._format_heading(paragraph)
-        elif self._contains_emphasis(paragraph):
-            return self._format_emphasized_text(paragraph)
-        else:
+        kind = self._classify(paragraph)
+        if kind == 'regular':
             return self._format_regular_paragraph(paragraph, is_first)
+        return self._paragraph_formatters[kind](paragraph)
+    
+    def _classify(self, text: str) -> str:
+        """
+        Classify a stripped paragraph by content type.
+        
+        Args:
+            text (str): Paragraph to classify, already stripped
+            
+        Returns:
+            str: Content type ('list', 'code', 'heading', 'emphasis' or 'regular')
+        """
+        if self._is_list_item(text):
+            return 'list'
+        elif self._is_code_block(text):
+            return 'code'
+        elif self._is_heading(text):
+            return 'heading'
+        elif self._contains_emphasis(text):
+            return 'emphasis'
+        return 'regular'
     
     def _is_list_item(self, text: str) -> bool:
         """Check if text is a list item."""
-        return text.strip().startswith(('•', '-', '*', '1.', '2.', '3.', '4.', '5.'))
+        return text.startswith(('•', '-', '*', '1.', '2.', '3.', '4.', '5.'))
     
     def _is_code_block(self, text: str) -> bool:
         """Check if text is a code block."""
-        return '```' in text or text.strip().startswith('    ')
+        return '```' in text or text.startswith('    ')
     
     def _is_heading(self, text: str) -> bool:
         """Check if text is a heading."""
-        return text.strip().startswith('#') or (len(text) < 100 and text.isupper())
+        # Long paragraphs are rejected by length before any case scan, and
+        # str.isupper() already stops at the first lowercase character
+        return text.startswith('#') or (len(text) < 100 and text.isupper())
     
     def _contains_emphasis(self, text: str) -> bool:
         """Check if text contains emphasis markers."""
-        return any(marker in text for marker in ['**', '*', '__', '_', '`'])
+        return _HAS_EMPHASIS(text) is not None
     
     def _format_list_item(self, text: str) -> str:
         """Format list items with colors."""
-        # Color the bullet point
-        if text.strip().startswith('•'):
-            return colorize('•', Colors.BRIGHT_CYAN) + ' ' + colorize(text.strip()[1:].strip(), Colors.WHITE)
-        elif text.strip().startswith(('-', '*')):
-            return colorize('▸', Colors.BRIGHT_MAGENTA) + ' ' + colorize(text.strip()[1:].strip(), Colors.WHITE)
-        elif re.match(r'^\d+\.', text.strip()):
-            number_part = re.match(r'^(\d+\.)', text.strip()).group(1)
-            rest = text.strip()[len(number_part):].strip()
-            return colorize(number_part, Colors.BRIGHT_YELLOW) + ' ' + colorize(rest, Colors.WHITE)
+        # Color the bullet point; text is already stripped, so only the gap
+        # after the marker needs trimming
+        if text.startswith('•'):
+            return self._colorize('•', _BRIGHT_CYAN) + ' ' + self._colorize(text[1:].lstrip(), _WHITE)
+        elif text.startswith(('-', '*')):
+            return self._colorize('▸', _BRIGHT_MAGENTA) + ' ' + self._colorize(text[1:].lstrip(), _WHITE)
+        
+        number_match = _LIST_NUMBER_RE.match(text)
+        if number_match:
+            number_part = number_match.group(1)
+            rest = text[len(number_part):].lstrip()
+            return self._colorize(number_part, _BRIGHT_YELLOW) + ' ' + self._colorize(rest, _WHITE)
         else:
-            return colorize(text, Colors.WHITE)
+            return self._colorize(text, _WHITE)
     
     def _format_code_block(self, text: str) -> str:
         """Format code blocks with colors."""
@@ -107,66 +249,50 @@ class ColorfulResponseFormatter:
             formatted_parts = []
             for i, part in enumerate(parts):
                 if i % 2 == 1:  # Code part
-                    formatted_parts.append(colorize(f"```{part}```", Colors.BRIGHT_GREEN, Colors.DIM))
+                    formatted_parts.append(self._colorize(f"```{part}```", _BRIGHT_GREEN, _DIM))
                 else:  # Regular text
-                    formatted_parts.append(colorize(part, Colors.WHITE))
+                    formatted_parts.append(self._colorize(part, _WHITE))
             return ''.join(formatted_parts)
         else:
             # Handle indented code
-            return colorize(text, Colors.BRIGHT_GREEN, Colors.DIM)
+            return self._colorize(text, _BRIGHT_GREEN, _DIM)
     
     def _format_heading(self, text: str) -> str:
         """Format headings with colors."""
-        if text.strip().startswith('#'):
+        if text.startswith('#'):
             # Markdown heading
             level = len(text) - len(text.lstrip('#'))
             heading_text = text.strip('#').strip()
             if level == 1:
-                return colorize(f"{'#' * level} {heading_text}", Colors.BRIGHT_CYAN, Colors.BOLD)
+                return self._colorize(f"{'#' * level} {heading_text}", _BRIGHT_CYAN, _BOLD)
             elif level == 2:
-                return colorize(f"{'#' * level} {heading_text}", Colors.CYAN, Colors.BOLD)
+                return self._colorize(f"{'#' * level} {heading_text}", _CYAN, _BOLD)
             else:
-                return colorize(f"{'#' * level} {heading_text}", Colors.BLUE, Colors.BOLD)
+                return self._colorize(f"{'#' * level} {heading_text}", _BLUE, _BOLD)
         else:
             # All caps heading
-            return colorize(text, Colors.BRIGHT_CYAN, Colors.BOLD)
+            return self._colorize(text, _BRIGHT_CYAN, _BOLD)
     
     def _format_emphasized_text(self, text: str) -> str:
         """Format text with enhanced emphasis markers."""
-        # Handle triple emphasis (***text***) - bold + italic combined
-        text = re.sub(r'\*\*\*(.*?)\*\*\*', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_YELLOW + Colors.BOLD + Colors.ITALIC), text)
-        
-        # Handle bold text (**text**) - make it more prominent
-        text = re.sub(r'\*\*(.*?)\*\*', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_WHITE, Colors.BOLD), text)
-        
-        # Handle italic text (*text*) - make it more elegant
-        text = re.sub(r'(?<!\*)\*([^*]+?)\*(?!\*)', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_CYAN, Colors.ITALIC), text)
-        
-        # Handle underlined bold (__text__)
-        text = re.sub(r'__(.*?)__', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_MAGENTA + Colors.BOLD + Colors.UNDERLINE), text)
-        
-        # Handle underlined italic (_text_)
-        text = re.sub(r'(?<!_)_([^_]+?)_(?!_)', 
-                     lambda m: colorize(m.group(1), Colors.CYAN + Colors.ITALIC + Colors.UNDERLINE), text)
-        
-        # Handle strikethrough (~~text~~)
-        text = re.sub(r'~~(.*?)~~', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_BLACK, Colors.STRIKETHROUGH), text)
-        
-        # Handle inline code with better visibility (`code`)
-        text = re.sub(r'`([^`]+?)`', 
-                     lambda m: colorize(f" {m.group(1)} ", Colors.BRIGHT_GREEN, Colors.BOLD), text)
+        # Color the remaining text
+        return self._colorize(_EMPHASIS_RE.sub(self._emphasis_replacement, text), _WHITE)
+    
+    def _emphasis_replacement(self, match: Match[str]) -> str:
+        """Colorize a single emphasis match according to the marker that matched."""
+        kind = cast(str, match.lastgroup)
+        content = match.group(_EMPHASIS_CONTENT_GROUP[kind])
         
-        # Handle highlighted text (==text==) - simulate highlight with bright background
-        text = re.sub(r'==(.*?)==', 
-                     lambda m: colorize(m.group(1), Colors.BLACK + Colors.BG_YELLOW, Colors.BOLD), text)
+        if kind == 'code':
+            # Inline code with better visibility (`code`); contents are left as-is
+            content = f" {content} "
+        else:
+            # Emphasis can be nested, e.g. inline code inside bold text
+            content = _EMPHASIS_RE.sub(self._emphasis_replacement, content)
         
-        # Color the remaining text
-        return colorize(text, Colors.WHITE)
+        if not self.colors_enabled:
+            return content
+        return _EMPHASIS_STYLES[kind] + content + _RESET
     
     def _format_regular_paragraph(self, text: str, is_first: bool = False) -> str:
         """Format regular paragraphs."""
@@ -175,49 +301,21 @@ class ColorfulResponseFormatter:
         
         if is_first:
             # Make first paragraph slightly brighter
-            return colorize(highlighted_text, Colors.BRIGHT_WHITE)
+            return self._colorize(highlighted_text, _BRIGHT_WHITE)
         else:
-            return colorize(highlighted_text, Colors.WHITE)
+            return self._colorize(highlighted_text, _WHITE)
     
     def _highlight_keywords(self, text: str) -> str:
         """Highlight important keywords in the text."""
-        # Define keywords to highlight
-        keywords = [
-            # Technical terms
-            'API', 'database', 'server', 'client', 'HTTP', 'HTTPS', 'JSON', 'XML',
-            'Python', 'JavaScript', 'SQL', 'HTML', 'CSS', 'React', 'Node.js',
-            
-            # Important concepts
-            'important', 'note', 'warning', 'error', 'success', 'failed', 'completed',
-            'required', 'optional', 'recommended', 'deprecated',
-            
-            # Action words
-            'install', 'configure', 'setup', 'deploy', 'build', 'test', 'debug',
-            'create', 'update', 'delete', 'modify', 'execute', 'run',
-            
-            # Status words
-            'active', 'inactive', 'enabled', 'disabled', 'online', 'offline'
-        ]
+        if not self.colors_enabled:
+            # Highlighting only adds color, so there is nothing to do
+            return text
         
-        # Highlight keywords (case-insensitive)
-        for keyword in keywords:
-            pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-            text = pattern.sub(lambda m: colorize(m.group(0), Colors.BRIGHT_YELLOW), text)
-        
-        # Highlight numbers
-        text = re.sub(r'\b\d+\b', lambda m: colorize(m.group(0), Colors.BRIGHT_CYAN), text)
-        
-        # Highlight URLs
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        text = re.sub(url_pattern, lambda m: colorize(m.group(0), Colors.BRIGHT_BLUE, Colors.UNDERLINE), text)
-        
-        # Highlight file paths
-        path_pattern = r'[/\\][\w\-_./\\]+'
-        text = re.sub(path_pattern, lambda m: colorize(m.group(0), Colors.BRIGHT_MAGENTA), text)
-        
-        return text
+        # Highlight URLs, file paths, keywords (case-insensitive, whole words)
+        # and numbers in a single pass so no match is split by another's colors
+        return _HIGHLIGHT_RE.sub(lambda m: _HIGHLIGHT_STYLES[cast(str, m.lastgroup)] + m.group(0) + _RESET, text)
     
-    def print_formatted_response(self, response: str, query: str = None):
+    def print_formatted_response(self, response: str, query: Optional[str] = None) -> None:
         """
         Print a beautifully formatted response.
         
@@ -226,21 +324,21 @@ class ColorfulResponseFormatter:
             query (str): The original query (optional)
         """
         # Print header
-        print(colorize("\n" + "═" * 60, Colors.BRIGHT_CYAN))
-        print(colorize("🤖 AI RESPONSE", Colors.BRIGHT_CYAN, Colors.BOLD))
-        print(colorize("═" * 60, Colors.BRIGHT_CYAN))
+        print(self._colorize("\n" + "═" * 60, _BRIGHT_CYAN))
+        print(self._colorize("🤖 AI RESPONSE", _BRIGHT_CYAN, _BOLD))
+        print(self._colorize("═" * 60, _BRIGHT_CYAN))
         
         # Print query context if provided
         if query:
-            print(colorize(f"📝 Query: {query}", Colors.BRIGHT_BLACK))
-            print(colorize("─" * 60, Colors.BRIGHT_BLACK))
+            print(self._colorize(f"📝 Query: {query}", _BRIGHT_BLACK))
+            print(self._colorize("─" * 60, _BRIGHT_BLACK))
         
         # Print formatted response
         formatted_response = self.format_response(response, query)
         print(f"\n{formatted_response}\n")
         
         # Print footer
-        print(colorize("═" * 60, Colors.BRIGHT_CYAN))
+        print(self._colorize("═" * 60, _BRIGHT_CYAN))
     
     def create_response_box(self, response: str, title: str = "AI Response") -> str:
         """
@@ -254,24 +352,24 @@ class ColorfulResponseFormatter:
             str: Boxed response
         """
         lines = response.split('\n')
-        max_width = max(len(line) for line in lines) if lines else 0
-        max_width = max(max_width, len(title) + 4)
+        max_width = max(max(map(len, lines), default=0), len(title) + 4)
         
-        # Create box
-        top_border = colorize("┌" + "─" * (max_width + 2) + "┐", Colors.BRIGHT_CYAN)
-        title_line = colorize(f"│ {title.center(max_width)} │", Colors.BRIGHT_CYAN, Colors.BOLD)
-        separator = colorize("├" + "─" * (max_width + 2) + "┤", Colors.BRIGHT_CYAN)
-        bottom_border = colorize("└" + "─" * (max_width + 2) + "┘", Colors.BRIGHT_CYAN)
+        # Create box; the horizontal rule is shared by all three borders
+        rule = "─" * (max_width + 2)
+        top_border = self._colorize(f"┌{rule}┐", _BRIGHT_CYAN)
+        title_line = self._colorize(f"│ {title.center(max_width)} │", _BRIGHT_CYAN, _BOLD)
+        separator = self._colorize(f"├{rule}┤", _BRIGHT_CYAN)
+        bottom_border = self._colorize(f"└{rule}┘", _BRIGHT_CYAN)
         
-        # Format content lines
-        content_lines = []
-        for line in lines:
-            padded_line = line.ljust(max_width)
-            content_lines.append(colorize(f"│ {padded_line} │", Colors.CYAN))
+        # Format content lines with the color codes built once for the whole box
+        if self.colors_enabled:
+            prefix, suffix = _CYAN + "│ ", " │" + _RESET
+        else:
+            prefix, suffix = "│ ", " │"
+        content = '\n'.join([f"{prefix}{line:<{max_width}}{suffix}" for line in lines])
         
         # Combine all parts
-        box_parts = [top_border, title_line, separator] + content_lines + [bottom_border]
-        return '\n'.join(box_parts)
+        return '\n'.join((top_border, title_line, separator, content, bottom_border))
 
 
 # Global formatter instance
@@ -279,12 +377,12 @@ response_formatter = ColorfulResponseFormatter()
 
 
 # Convenience functions
-def format_response(response: str, query: str = None) -> str:
+def format_response(response: str, query: Optional[str] = None) -> str:
     """Format response using the global formatter."""
     return response_formatter.format_response(response, query)
 
 
-def print_colorful_response(response: str, query: str = None):
+def print_colorful_response(response: str, query: Optional[str] = None) -> None:
     """Print colorful response using the global formatter."""
     response_formatter.print_formatted_response(response, query)
 
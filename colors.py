@@ -5,59 +5,62 @@ This module provides ANSI color codes and utility functions for colorizing termi
 """
 
 import sys
-from typing import Optional
+from typing import ClassVar, Final, Optional
 
 
 class Colors:
     """ANSI color codes for terminal output."""
     
     # Reset
-    RESET = '\033[0m'
+    RESET: Final = '\033[0m'
     
     # Regular colors
-    BLACK = '\033[30m'
-    RED = '\033[31m'
-    GREEN = '\033[32m'
-    YELLOW = '\033[33m'
-    BLUE = '\033[34m'
-    MAGENTA = '\033[35m'
-    CYAN = '\033[36m'
-    WHITE = '\033[37m'
+    BLACK: Final = '\033[30m'
+    RED: Final = '\033[31m'
+    GREEN: Final = '\033[32m'
+    YELLOW: Final = '\033[33m'
+    BLUE: Final = '\033[34m'
+    MAGENTA: Final = '\033[35m'
+    CYAN: Final = '\033[36m'
+    WHITE: Final = '\033[37m'
     
     # Bright colors
-    BRIGHT_BLACK = '\033[90m'
-    BRIGHT_RED = '\033[91m'
-    BRIGHT_GREEN = '\033[92m'
-    BRIGHT_YELLOW = '\033[93m'
-    BRIGHT_BLUE = '\033[94m'
-    BRIGHT_MAGENTA = '\033[95m'
-    BRIGHT_CYAN = '\033[96m'
-    BRIGHT_WHITE = '\033[97m'
+    BRIGHT_BLACK: Final = '\033[90m'
+    BRIGHT_RED: Final = '\033[91m'
+    BRIGHT_GREEN: Final = '\033[92m'
+    BRIGHT_YELLOW: Final = '\033[93m'
+    BRIGHT_BLUE: Final = '\033[94m'
+    BRIGHT_MAGENTA: Final = '\033[95m'
+    BRIGHT_CYAN: Final = '\033[96m'
+    BRIGHT_WHITE: Final = '\033[97m'
     
     # Background colors
-    BG_BLACK = '\033[40m'
-    BG_RED = '\033[41m'
-    BG_GREEN = '\033[42m'
-    BG_YELLOW = '\033[43m'
-    BG_BLUE = '\033[44m'
-    BG_MAGENTA = '\033[45m'
-    BG_CYAN = '\033[46m'
-    BG_WHITE = '\033[47m'
+    BG_BLACK: Final = '\033[40m'
+    BG_RED: Final = '\033[41m'
+    BG_GREEN: Final = '\033[42m'
+    BG_YELLOW: Final = '\033[43m'
+    BG_BLUE: Final = '\033[44m'
+    BG_MAGENTA: Final = '\033[45m'
+    BG_CYAN: Final = '\033[46m'
+    BG_WHITE: Final = '\033[47m'
     
     # Text styles
-    BOLD = '\033[1m'
-    DIM = '\033[2m'
-    ITALIC = '\033[3m'
-    UNDERLINE = '\033[4m'
-    BLINK = '\033[5m'
-    REVERSE = '\033[7m'
-    STRIKETHROUGH = '\033[9m'
+    BOLD: Final = '\033[1m'
+    DIM: Final = '\033[2m'
+    ITALIC: Final = '\033[3m'
+    UNDERLINE: Final = '\033[4m'
+    BLINK: Final = '\033[5m'
+    REVERSE: Final = '\033[7m'
+    STRIKETHROUGH: Final = '\033[9m'
 
 
 class ColorPrinter:
     """Utility class for printing colored text."""
     
-    def __init__(self, enable_colors: bool = None):
+    # Terminal color support, detected once per process and shared by all printers
+    _color_support: ClassVar[Optional[bool]] = None
+    
+    def __init__(self, enable_colors: Optional[bool] = None) -> None:
         """
         Initialize ColorPrinter.
         
@@ -66,7 +69,9 @@ class ColorPrinter:
         """
         if enable_colors is None:
             # Auto-detect color support
-            self.colors_enabled = self._supports_color()
+            if ColorPrinter._color_support is None:
+                ColorPrinter._color_support = self._supports_color()
+            self.colors_enabled = ColorPrinter._color_support
         else:
             self.colors_enabled = enable_colors
     
@@ -113,13 +118,12 @@ class ColorPrinter:
         if not self.colors_enabled:
             return text
         
-        result = color + text + Colors.RESET
+        # Build the result in one step; \033[0m is Colors.RESET
         if style:
-            result = style + result
-        
-        return result
+            return f"{style}{color}{text}\033[0m"
+        return f"{color}{text}\033[0m"
     
-    def print_colored(self, text: str, color: str, style: Optional[str] = None, **kwargs):
+    def print_colored(self, text: str, color: str, style: Optional[str] = None, **kwargs) -> None:
         """
         Print colored text.
         
@@ -132,39 +136,39 @@ class ColorPrinter:
         colored_text = self.colorize(text, color, style)
         print(colored_text, **kwargs)
     
-    def success(self, text: str, **kwargs):
+    def success(self, text: str, **kwargs) -> None:
         """Print success message in green."""
         self.print_colored(f"✓ {text}", Colors.BRIGHT_GREEN, **kwargs)
     
-    def error(self, text: str, **kwargs):
+    def error(self, text: str, **kwargs) -> None:
         """Print error message in red."""
         self.print_colored(f"✗ {text}", Colors.BRIGHT_RED, **kwargs)
     
-    def warning(self, text: str, **kwargs):
+    def warning(self, text: str, **kwargs) -> None:
         """Print warning message in yellow."""
         self.print_colored(f"⚠️  {text}", Colors.BRIGHT_YELLOW, **kwargs)
     
-    def info(self, text: str, **kwargs):
+    def info(self, text: str, **kwargs) -> None:
         """Print info message in blue."""
         self.print_colored(f"ℹ️  {text}", Colors.BRIGHT_BLUE, **kwargs)
     
-    def header(self, text: str, **kwargs):
+    def header(self, text: str, **kwargs) -> None:
         """Print header text in bold cyan."""
         self.print_colored(text, Colors.BRIGHT_CYAN, Colors.BOLD, **kwargs)
     
-    def subheader(self, text: str, **kwargs):
+    def subheader(self, text: str, **kwargs) -> None:
         """Print subheader text in cyan."""
         self.print_colored(text, Colors.CYAN, **kwargs)
     
-    def command(self, text: str, **kwargs):
+    def command(self, text: str, **kwargs) -> None:
         """Print command text in magenta."""
         self.print_colored(text, Colors.BRIGHT_MAGENTA, **kwargs)
     
-    def prompt(self, text: str, **kwargs):
+    def prompt(self, text: str, **kwargs) -> None:
         """Print prompt text in bright white."""
         self.print_colored(text, Colors.BRIGHT_WHITE, Colors.BOLD, **kwargs)
     
-    def dim(self, text: str, **kwargs):
+    def dim(self, text: str, **kwargs) -> None:
         """Print dimmed text."""
         self.print_colored(text, Colors.BRIGHT_BLACK, **kwargs)
 
@@ -179,46 +183,46 @@ def colorize(text: str, color: str, style: Optional[str] = None) -> str:
     return color_printer.colorize(text, color, style)
 
 
-def print_success(text: str, **kwargs):
+def print_success(text: str, **kwargs) -> None:
     """Print success message."""
     color_printer.success(text, **kwargs)
 
 
-def print_error(text: str, **kwargs):
+def print_error(text: str, **kwargs) -> None:
     """Print error message."""
     color_printer.error(text, **kwargs)
 
 
-def print_warning(text: str, **kwargs):
+def print_warning(text: str, **kwargs) -> None:
     """Print warning message."""
     color_printer.warning(text, **kwargs)
 
 
-def print_info(text: str, **kwargs):
+def print_info(text: str, **kwargs) -> None:
     """Print info message."""
     color_printer.info(text, **kwargs)
 
 
-def print_header(text: str, **kwargs):
+def print_header(text: str, **kwargs) -> None:
     """Print header text."""
     color_printer.header(text, **kwargs)
 
 
-def print_subheader(text: str, **kwargs):
+def print_subheader(text: str, **kwargs) -> None:
     """Print subheader text."""
     color_printer.subheader(text, **kwargs)
 
 
-def print_command(text: str, **kwargs):
+def print_command(text: str, **kwargs) -> None:
     """Print command text."""
     color_printer.command(text, **kwargs)
 
 
-def print_prompt(text: str, **kwargs):
+def print_prompt(text: str, **kwargs) -> None:
     """Print prompt text."""
     color_printer.prompt(text, **kwargs)
 
 
-def print_dim(text: str, **kwargs):
+def print_dim(text: str, **kwargs) -> None:
     """Print dimmed text."""
     color_printer.dim(text, **kwargs)
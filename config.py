@@ -4,79 +4,110 @@ Loads environment variables from .env file and provides default values.
 """
 
 import os
-from dotenv import load_dotenv
-from typing import Optional
-
-# Load environment variables from .env file
-load_dotenv()
+from typing import Any, Callable, Optional
+
+# Whether the .env file has been loaded into the environment yet
+_env_loaded = False
+
+
+def _load_env():
+    """Load environment variables from the .env file on first use."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def _as_bool(value: str) -> bool:
+    """Parse a 'true'/'false' environment value."""
+    return value.lower() == 'true'
+
+
+class _EnvSetting:
+    """
+    Configuration value read from the environment on first access.
+    
+    The .env file is only loaded once a setting is actually read, after which
+    the parsed value replaces this descriptor on the class so later reads are
+    plain attribute lookups.
+    """
+    
+    def __init__(self, default: str, cast: Callable[[str], Any] = str):
+        """
+        Args:
+            default (str): Value used when the environment variable is unset
+            cast (callable): Converts the raw string to the setting's type
+        """
+        self.default = default
+        self.cast = cast
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, instance, owner):
+        _load_env()
+        value = self.cast(os.getenv(self.name, self.default))
+        setattr(owner, self.name, value)
+        return value
 
 class Config:
     """Configuration class that loads settings from environment variables."""
 
     # ChromaDB Configuration
-    CHROMA_DB_PATH: str = os.getenv('CHROMA_DB_PATH', './chroma_db')
-    COLLECTION_NAME: str = os.getenv('COLLECTION_NAME', 'docs_with_mxbai_embed')
+    CHROMA_DB_PATH: str = _EnvSetting('./chroma_db')
+    COLLECTION_NAME: str = _EnvSetting('docs_with_mxbai_embed')
 
     # Ollama Models Configuration
-    EMBEDDING_MODEL: str = os.getenv('EMBEDDING_MODEL', 'mxbai-embed-large')
-    GENERATION_MODEL: str = os.getenv('GENERATION_MODEL', 'gemma3n:e4b')
+    EMBEDDING_MODEL: str = _EnvSetting('mxbai-embed-large')
+    GENERATION_MODEL: str = _EnvSetting('gemma3n:e4b')
 
     # Sentence Transformer Model
-    SENTENCE_TRANSFORMER_MODEL: str = os.getenv('SENTENCE_TRANSFORMER_MODEL', 'BAAI/bge-large-en-v1.5')
+    SENTENCE_TRANSFORMER_MODEL: str = _EnvSetting('BAAI/bge-large-en-v1.5')
 
     # File Processing Configuration
-    DEFAULT_FILE_PATH: str = os.getenv('DEFAULT_FILE_PATH', 'context.txt')
-    MAX_RETRIEVED_DATA_LENGTH: int = int(os.getenv('MAX_RETRIEVED_DATA_LENGTH', '1000'))
+    DEFAULT_FILE_PATH: str = _EnvSetting('context.txt')
+    MAX_RETRIEVED_DATA_LENGTH: int = _EnvSetting('1000', int)
+    MAX_QUERY_LEN: int = _EnvSetting('4000', int)
 
     # RAG Configuration
-    MAX_RESULTS: int = int(os.getenv('MAX_RESULTS', '1'))
-    CONTEXT_WINDOW_SIZE: int = int(os.getenv('CONTEXT_WINDOW_SIZE', '1000'))
+    MAX_RESULTS: int = _EnvSetting('1', int)
+    CONTEXT_WINDOW_SIZE: int = _EnvSetting('1000', int)
 
     # Dynamic Distance Filtering Configuration
-    ENABLE_DISTANCE_FILTERING: bool = os.getenv('ENABLE_DISTANCE_FILTERING', 'true').lower() == 'true'
-    BASE_DISTANCE_THRESHOLD: float = float(os.getenv('BASE_DISTANCE_THRESHOLD', '0.8'))
-    DYNAMIC_THRESHOLD_RATIO: float = float(os.getenv('DYNAMIC_THRESHOLD_RATIO', '0.7'))
-    MIN_RESULTS_FOR_FILTERING: int = int(os.getenv('MIN_RESULTS_FOR_FILTERING', '2'))
-    FALLBACK_DISTANCE_THRESHOLD: float = float(os.getenv('FALLBACK_DISTANCE_THRESHOLD', '1.0'))
-    HARD_DISTANCE_THRESHOLD: float = float(os.getenv('HARD_DISTANCE_THRESHOLD', '1.0'))
-    DISTANCE_DEBUG_MODE: bool = os.getenv('DISTANCE_DEBUG_MODE', 'false').lower() == 'true'
+    ENABLE_DISTANCE_FILTERING: bool = _EnvSetting('true', _as_bool)
+    BASE_DISTANCE_THRESHOLD: float = _EnvSetting('0.8', float)
+    DYNAMIC_THRESHOLD_RATIO: float = _EnvSetting('0.7', float)
+    MIN_RESULTS_FOR_FILTERING: int = _EnvSetting('2', int)
+    FALLBACK_DISTANCE_THRESHOLD: float = _EnvSetting('1.0', float)
+    HARD_DISTANCE_THRESHOLD: float = _EnvSetting('1.0', float)
+    DISTANCE_DEBUG_MODE: bool = _EnvSetting('false', _as_bool)
+
+    # Response Cache Configuration
+    ENABLE_RESPONSE_CACHE: bool = _EnvSetting('true', _as_bool)
+    RESPONSE_CACHE_MAX_ENTRIES: int = _EnvSetting('10000', int)
+    RESPONSE_CACHE_SIMILARITY: float = _EnvSetting('0.92', float)
+    EMBED_CACHE_MAX: int = _EnvSetting('4096', int)
+
+    # Speculative Generation Configuration
+    SPECULATIVE_GENERATION: bool = _EnvSetting('false', _as_bool)
 
     # Optional: Ollama Server Configuration
-    OLLAMA_HOST: str = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
-    OLLAMA_TIMEOUT: int = int(os.getenv('OLLAMA_TIMEOUT', '30'))
+    OLLAMA_HOST: str = _EnvSetting('http://localhost:11434')
+    OLLAMA_TIMEOUT: int = _EnvSetting('30', int)
+    KEEP_ALIVE: str = _EnvSetting('30m')
+    PREWARM_MODELS: bool = _EnvSetting('true', _as_bool)
 
     # Debug Configuration
-    DEBUG_MODE: bool = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
-    VERBOSE_LOGGING: bool = os.getenv('VERBOSE_LOGGING', 'true').lower() == 'true'
+    DEBUG_MODE: bool = _EnvSetting('false', _as_bool)
+    VERBOSE_LOGGING: bool = _EnvSetting('true', _as_bool)
 
-    ANONYMIZED_TELEMETRY: bool = os.getenv('ANONYMIZED_TELEMETRY', 'false').lower() == 'true'
+    ANONYMIZED_TELEMETRY: bool = _EnvSetting('false', _as_bool)
 
     @classmethod
     def get_env_info(cls) -> dict:
         """Returns a dictionary of all configuration values."""
-        return {
-            'CHROMA_DB_PATH': cls.CHROMA_DB_PATH,
-            'COLLECTION_NAME': cls.COLLECTION_NAME,
-            'EMBEDDING_MODEL': cls.EMBEDDING_MODEL,
-            'GENERATION_MODEL': cls.GENERATION_MODEL,
-            'SENTENCE_TRANSFORMER_MODEL': cls.SENTENCE_TRANSFORMER_MODEL,
-            'DEFAULT_FILE_PATH': cls.DEFAULT_FILE_PATH,
-            'MAX_RETRIEVED_DATA_LENGTH': cls.MAX_RETRIEVED_DATA_LENGTH,
-            'MAX_RESULTS': cls.MAX_RESULTS,
-            'CONTEXT_WINDOW_SIZE': cls.CONTEXT_WINDOW_SIZE,
-            'ENABLE_DISTANCE_FILTERING': cls.ENABLE_DISTANCE_FILTERING,
-            'BASE_DISTANCE_THRESHOLD': cls.BASE_DISTANCE_THRESHOLD,
-            'DYNAMIC_THRESHOLD_RATIO': cls.DYNAMIC_THRESHOLD_RATIO,
-            'MIN_RESULTS_FOR_FILTERING': cls.MIN_RESULTS_FOR_FILTERING,
-            'FALLBACK_DISTANCE_THRESHOLD': cls.FALLBACK_DISTANCE_THRESHOLD,
-            'HARD_DISTANCE_THRESHOLD': cls.HARD_DISTANCE_THRESHOLD,
-            'DISTANCE_DEBUG_MODE': cls.DISTANCE_DEBUG_MODE,
-            'OLLAMA_HOST': cls.OLLAMA_HOST,
-            'OLLAMA_TIMEOUT': cls.OLLAMA_TIMEOUT,
-            'DEBUG_MODE': cls.DEBUG_MODE,
-            'VERBOSE_LOGGING': cls.VERBOSE_LOGGING,
-            'ANONYMIZED_TELEMETRY': cls.ANONYMIZED_TELEMETRY
-        }
+        return {name: getattr(cls, name) for name in cls._FIELDS}
 
     @classmethod
     def print_config(cls):
@@ -86,9 +117,28 @@ class Config:
             print(f"{key}: {value}")
         print("=" * 27)
 
+# Names of all configuration settings, in declaration order
+Config._FIELDS = tuple(name for name, value in vars(Config).items() if name.isupper() and not callable(value))
+
 # Create a global config instance
 config = Config()
 
+
+def __getattr__(name: str) -> Any:
+    """
+    Expose configuration settings as module constants, e.g.
+    ``from config import MAX_RESULTS``.
+    
+    Each value is resolved on first access, so importing this module still
+    does not load the .env file, and is then stored as a module global so
+    later lookups skip this hook and the class attribute lookup entirely.
+    """
+    if name in Config._FIELDS:
+        value = getattr(Config, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def get_config() -> Config:
     """Returns the global configuration instance."""
     return config
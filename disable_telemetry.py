@@ -14,21 +14,9 @@ try:
     # Disable posthog completely
     posthog.disabled = True
     
-    # Override the capture method to prevent errors
-    original_capture = posthog.capture
-    def safe_capture(*args, **kwargs):
-        try:
-            if len(args) == 3:
-                # Fix the argument mismatch by restructuring the call
-                user_id, event_name, properties = args
-                return original_capture(user_id, event_name, properties, **kwargs)
-            else:
-                return original_capture(*args, **kwargs)
-        except Exception:
-            # Silently ignore telemetry errors
-            pass
-    
-    posthog.capture = safe_capture
+    # Telemetry is off, so capture calls are simply dropped; a no-op cannot
+    # hit the capture argument mismatch error
+    posthog.capture = lambda *args, **kwargs: None
 except ImportError:
     # posthog not available, which is fine
     pass
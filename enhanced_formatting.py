@@ -6,8 +6,204 @@ building upon the existing colorful response formatter with improved emphasis.
 """
 
 import re
+import functools
 from typing import List, Tuple
-from colors import Colors, ColorPrinter, colorize
+from colors import Colors, ColorPrinter, colorize, color_printer
+
+# Number of rendered response displays kept per formatter
+DISPLAY_CACHE_MAXSIZE = 128
+
+# Number of syntax-highlighted code blocks kept across all formatters
+HIGHLIGHT_CACHE_MAXSIZE = 256
+
+# Shortest text scanned with the compiled emphasis scanner when numba is
+# available; below this the array conversion costs more than it saves
+NUMBA_EMPHASIS_MIN_LENGTH = 500
+
+# Compiled emphasis scanner: None until first needed, False if numba is missing
+_numba_emphasis_scanner = None
+
+# ANSI prefix for each emphasis kind, assembled once (style codes first, as
+# colorize() would emit them); every span is closed with Colors.RESET
+_EMPHASIS_PREFIXES = {
+    # Triple emphasis (***text***) - bold + italic combined
+    'triple': Colors.BRIGHT_YELLOW + Colors.BOLD + Colors.ITALIC,
+    # Bold text (**text**) - make it more prominent
+    'bold': Colors.BOLD + Colors.BRIGHT_WHITE,
+    # Italic text (*text*) - make it more elegant
+    'italic': Colors.ITALIC + Colors.BRIGHT_CYAN,
+    # Underlined bold (__text__)
+    'ubold': Colors.BRIGHT_MAGENTA + Colors.BOLD + Colors.UNDERLINE,
+    # Underlined italic (_text_)
+    'uitalic': Colors.CYAN + Colors.ITALIC + Colors.UNDERLINE,
+    # Strikethrough (~~text~~)
+    'strike': Colors.STRIKETHROUGH + Colors.BRIGHT_BLACK,
+    # Inline code with better visibility (`code`)
+    'code': Colors.BOLD + Colors.BRIGHT_GREEN,
+    # Highlighted text (==text==) - simulate highlight with bright background
+    'highlight': Colors.BOLD + Colors.BLACK + Colors.BG_YELLOW,
+}
+
+# Characters that can start an emphasis marker
+_MARKER_CHARS = '*_~`='
+
+# Paired markers by first character, longest first: the text between them may
+# be empty but may not contain a newline
+_PAIRED_MARKERS = {
+    '*': (('***', 'triple'), ('**', 'bold')),
+    '_': (('__', 'ubold'),),
+    '~': (('~~', 'strike'),),
+    '=': (('==', 'highlight'),),
+}
+
+# Single-character markers: the text between them must be non-empty and may
+# not contain the marker or a blank line
+_SINGLE_MARKERS = {'*': 'italic', '_': 'uitalic', '`': 'code'}
+
+# (marks, color, style) for heading levels 1-3; deeper headings use bright blue
+_HEADING_STYLES = (
+    ('#', Colors.BRIGHT_CYAN, Colors.BOLD),
+    ('##', Colors.CYAN, Colors.BOLD),
+    ('###', Colors.BLUE, Colors.BOLD),
+)
+
+_RE_NUM_LIST = re.compile(r'^(\d+\.)')
+
+# Syntax highlighting patterns for code blocks
+_CODE_KEYWORDS = ('def', 'class', 'import', 'from', 'if', 'else', 'elif', 'for', 'while', 'try', 'except', 'return')
+_RE_CODE_KEYWORD = re.compile(r'\b(?:' + '|'.join(_CODE_KEYWORDS) + r')\b')
+
+# String literals and comments resolved in one left-to-right pass, so a '#'
+# inside a string or a quote inside a comment is not highlighted separately
+_RE_CODE_LITERAL = re.compile(r'(?P<string>"[^"]*"|\'[^\']*\')|(?P<comment>#.*$)', re.MULTILINE)
+_CODE_LITERAL_STYLES = {
+    'string': (Colors.BRIGHT_GREEN, None),
+    'comment': (Colors.BRIGHT_BLACK, Colors.ITALIC),
+}
+
+# Fixed header/footer pieces of the response display, prebuilt with colors on
+# and off: (rule, title prefix, title suffix, query label, query separator)
+_DISPLAY_RULE = "═" * 70
+_QUERY_RULE = "─" * 70
+_DISPLAY_CHROME = {
+    True: (
+        Colors.BRIGHT_CYAN + _DISPLAY_RULE + Colors.RESET,
+        Colors.BOLD + Colors.BRIGHT_CYAN + "🤖 ",
+        Colors.RESET,
+        Colors.BOLD + Colors.BRIGHT_YELLOW + "📝 Query:" + Colors.RESET,
+        Colors.BRIGHT_BLACK + _QUERY_RULE + Colors.RESET,
+    ),
+    False: (_DISPLAY_RULE, "🤖 ", "", "📝 Query:", _QUERY_RULE),
+}
+
+
+def _load_numba_emphasis_scanner():
+    """
+    Import the compiled emphasis scanner on first use, so importing this module
+    does not pay for importing numba.
+    
+    Returns:
+        callable: Numba version of _emphasis_spans, or None if numba is not installed
+    """
+    global _numba_emphasis_scanner
+    if _numba_emphasis_scanner is None:
+        from _emphasis_numba import HAVE_NUMBA, emphasis_spans
+        _numba_emphasis_scanner = emphasis_spans if HAVE_NUMBA else False
+    return _numba_emphasis_scanner or None
+
+
+def _emphasis_spans(text: str) -> List[Tuple[int, int, str, int]]:
+    """
+    Find the emphasis markers in text with a single left-to-right scan.
+    
+    At each marker character the kinds are tried in priority order (triple,
+    bold, italic, underlined bold, underlined italic, strikethrough, code,
+    highlight); the first that closes wins and scanning resumes after it.
+    Plain text between markers is skipped with str.find, so no regex or
+    match objects are involved.
+    
+    Args:
+        text (str): Text to scan
+        
+    Returns:
+        List[Tuple[int, int, str, int]]: (start, end, kind, marker width) of
+            each emphasis, where the content is text[start + width:end - width]
+    """
+    spans = []
+    find = text.find
+    length = len(text)
+    pos = 0
+    
+    while pos < length:
+        # Jump to the next character that could start a marker
+        next_pos = length
+        for char in _MARKER_CHARS:
+            index = find(char, pos, next_pos)
+            if index != -1:
+                next_pos = index
+        if next_pos == length:
+            break
+        pos = next_pos
+        char = text[pos]
+        
+        # Paired markers (***, **, __, ~~, ==) close at the next occurrence
+        # on the same line
+        matched = False
+        for marker, kind in _PAIRED_MARKERS.get(char, ()):
+            if text.startswith(marker, pos):
+                width = len(marker)
+                close = find(marker, pos + width)
+                if close != -1 and find('\n', pos + width, close) == -1:
+                    spans.append((pos, close + width, kind, width))
+                    pos = close + width
+                    matched = True
+                    break
+        if matched:
+            continue
+        
+        # Single markers (*, _, `) close at the next occurrence of the marker;
+        # * and _ must not be part of a longer run of the same character
+        kind = _SINGLE_MARKERS.get(char)
+        if kind is not None and (char == '`' or pos == 0 or text[pos - 1] != char):
+            close = find(char, pos + 1)
+            if (close > pos + 1 and find('\n\n', pos + 1, close) == -1
+                    and (char == '`' or not text.startswith(char, close + 1))):
+                spans.append((pos, close + 1, kind, 1))
+                pos = close + 1
+                continue
+        
+        pos += 1
+    
+    return spans
+
+
+@functools.lru_cache(maxsize=HIGHLIGHT_CACHE_MAXSIZE)
+def _highlight_code(code: str, colors_enabled: bool) -> str:
+    """
+    Apply basic syntax highlighting to code, caching the result.
+    
+    Args:
+        code (str): Body of a fenced code block
+        colors_enabled (bool): Global color state, part of the cache key since
+            the output differs when colors are off
+        
+    Returns:
+        str: Highlighted code
+    """
+    # Keywords
+    code = _RE_CODE_KEYWORD.sub(lambda m: colorize(m.group(0), Colors.BRIGHT_MAGENTA, Colors.BOLD), code)
+    
+    # Strings and comments
+    code = _RE_CODE_LITERAL.sub(lambda m: colorize(m.group(0), *_CODE_LITERAL_STYLES[m.lastgroup]), code)
+    
+    return code
+
+
+def _has_emphasis_marker(text: str) -> bool:
+    """Check whether text contains any character that starts an emphasis marker."""
+    # Chained substring tests use CPython's fast C search for each character,
+    # which beats both a regex character class and str.translate here
+    return '*' in text or '_' in text or '~' in text or '`' in text or '=' in text
 
 
 class EnhancedFormatter:
@@ -21,6 +217,9 @@ class EnhancedFormatter:
             enable_colors (bool): Whether to enable colors. Auto-detect if None.
         """
         self.color_printer = ColorPrinter(enable_colors)
+        
+        # Rendered displays, so re-showing the same answer skips formatting
+        self._display_cache = functools.lru_cache(maxsize=DISPLAY_CACHE_MAXSIZE)(self._render_response_display)
     
     def format_with_enhanced_emphasis(self, text: str) -> str:
         """
@@ -32,39 +231,36 @@ class EnhancedFormatter:
         Returns:
             str: Text with enhanced formatting
         """
-        # Handle triple emphasis (***text***) - bold + italic combined
-        text = re.sub(r'\*\*\*(.*?)\*\*\*', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_YELLOW + Colors.BOLD + Colors.ITALIC), text)
-        
-        # Handle bold text (**text**) - make it more prominent
-        text = re.sub(r'\*\*(.*?)\*\*', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_WHITE, Colors.BOLD), text)
-        
-        # Handle italic text (*text*) - make it more elegant
-        text = re.sub(r'(?<!\*)\*([^*]+?)\*(?!\*)', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_CYAN, Colors.ITALIC), text)
-        
-        # Handle underlined bold (__text__)
-        text = re.sub(r'__(.*?)__', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_MAGENTA + Colors.BOLD + Colors.UNDERLINE), text)
-        
-        # Handle underlined italic (_text_)
-        text = re.sub(r'(?<!_)_([^_]+?)_(?!_)', 
-                     lambda m: colorize(m.group(1), Colors.CYAN + Colors.ITALIC + Colors.UNDERLINE), text)
-        
-        # Handle strikethrough (~~text~~)
-        text = re.sub(r'~~(.*?)~~', 
-                     lambda m: colorize(m.group(1), Colors.BRIGHT_BLACK, Colors.STRIKETHROUGH), text)
+        if not _has_emphasis_marker(text):
+            # Plain text, nothing to format
+            return text
         
-        # Handle inline code with better visibility (`code`)
-        text = re.sub(r'`([^`]+?)`', 
-                     lambda m: colorize(f" {m.group(1)} ", Colors.BRIGHT_GREEN, Colors.BOLD), text)
+        scanner = _load_numba_emphasis_scanner() if len(text) >= NUMBA_EMPHASIS_MIN_LENGTH else None
+        spans = scanner(text) if scanner else _emphasis_spans(text)
+        if not spans:
+            return text
         
-        # Handle highlighted text (==text==) - simulate highlight with bright background
-        text = re.sub(r'==(.*?)==', 
-                     lambda m: colorize(m.group(1), Colors.BLACK + Colors.BG_YELLOW, Colors.BOLD), text)
+        parts = []
+        last_end = 0
+        for start, end, kind, width in spans:
+            parts.append(text[last_end:start])
+            parts.append(self._format_emphasis(kind, text[start + width:end - width]))
+            last_end = end
+        parts.append(text[last_end:])
+        return ''.join(parts)
+    
+    def _format_emphasis(self, kind: str, content: str) -> str:
+        """Colorize the content of a single emphasis span according to its kind."""
+        if kind == 'code':
+            # Inline code is padded for visibility and its contents left as-is
+            content = f" {content} "
+        else:
+            # Emphasis can be nested, e.g. inline code inside bold text
+            content = self.format_with_enhanced_emphasis(content)
         
-        return text
+        if not color_printer.colors_enabled:
+            return content
+        return _EMPHASIS_PREFIXES[kind] + content + Colors.RESET
     
     def format_response_with_enhanced_emphasis(self, response: str) -> str:
         """
@@ -76,23 +272,29 @@ class EnhancedFormatter:
         Returns:
             str: Formatted response
         """
-        if not response.strip():
+        stripped = response.strip()
+        if not stripped:
             return colorize("No response generated.", Colors.BRIGHT_BLACK)
         
-        # Split into paragraphs and process each
+        if '\n\n' not in stripped:
+            # Single paragraph (e.g. "Yes." or "OK"), no need to split and rejoin
+            return self._apply_paragraph_formatting(self.format_with_enhanced_emphasis(stripped), True)
+        
+        # Split into paragraphs
         paragraphs = [p.strip() for p in response.split('\n\n') if p.strip()]
-        formatted_paragraphs = []
         
-        for i, paragraph in enumerate(paragraphs):
-            # Apply enhanced emphasis formatting
-            formatted_paragraph = self.format_with_enhanced_emphasis(paragraph)
-            
-            # Apply additional paragraph-level formatting
-            formatted_paragraph = self._apply_paragraph_formatting(formatted_paragraph, i == 0)
-            
-            formatted_paragraphs.append(formatted_paragraph)
+        # Apply enhanced emphasis formatting to all paragraphs in one pass
+        emphasized = self.format_with_enhanced_emphasis('\n\n'.join(paragraphs)).split('\n\n')
+        if len(emphasized) != len(paragraphs):
+            # Stripping markers around empty emphasis (with colors off) created
+            # a new paragraph break, so format the paragraphs separately instead
+            emphasized = [self.format_with_enhanced_emphasis(p) for p in paragraphs]
         
-        return '\n\n'.join(formatted_paragraphs)
+        # Apply additional paragraph-level formatting
+        return '\n\n'.join(
+            self._apply_paragraph_formatting(paragraph, i == 0)
+            for i, paragraph in enumerate(emphasized)
+        )
     
     def _apply_paragraph_formatting(self, paragraph: str, is_first: bool = False) -> str:
         """Apply paragraph-level formatting."""
@@ -126,14 +328,11 @@ class EnhancedFormatter:
         # Apply emphasis formatting to heading text
         heading_text = self.format_with_enhanced_emphasis(heading_text)
         
-        if level == 1:
-            return colorize(f"{'#' * level} {heading_text}", Colors.BRIGHT_CYAN, Colors.BOLD)
-        elif level == 2:
-            return colorize(f"{'#' * level} {heading_text}", Colors.CYAN, Colors.BOLD)
-        elif level == 3:
-            return colorize(f"{'#' * level} {heading_text}", Colors.BLUE, Colors.BOLD)
+        if 1 <= level <= len(_HEADING_STYLES):
+            marks, color, style = _HEADING_STYLES[level - 1]
         else:
-            return colorize(f"{'#' * level} {heading_text}", Colors.BRIGHT_BLUE)
+            marks, color, style = '#' * level, Colors.BRIGHT_BLUE, None
+        return colorize(f"{marks} {heading_text}", color, style)
     
     def _is_list_item(self, text: str) -> bool:
         """Check if text is a list item."""
@@ -144,33 +343,36 @@ class EnhancedFormatter:
         # Apply emphasis formatting first
         formatted_text = self.format_with_enhanced_emphasis(text)
         
-        # Then apply list formatting
-        if formatted_text.strip().startswith('•'):
-            return colorize('•', Colors.BRIGHT_CYAN) + ' ' + formatted_text.strip()[1:].strip()
-        elif formatted_text.strip().startswith(('-', '*')):
-            return colorize('▸', Colors.BRIGHT_MAGENTA) + ' ' + formatted_text.strip()[1:].strip()
-        elif re.match(r'^\d+\.', formatted_text.strip()):
-            number_part = re.match(r'^(\d+\.)', formatted_text.strip()).group(1)
-            rest = formatted_text.strip()[len(number_part):].strip()
-            return colorize(number_part, Colors.BRIGHT_YELLOW) + ' ' + rest
+        # Then apply list formatting; strip once, after which only the gap
+        # following the marker needs trimming
+        stripped = formatted_text.strip()
+        if stripped.startswith('•'):
+            return colorize('•', Colors.BRIGHT_CYAN) + ' ' + stripped[1:].lstrip()
+        elif stripped.startswith(('-', '*')):
+            return colorize('▸', Colors.BRIGHT_MAGENTA) + ' ' + stripped[1:].lstrip()
+        
+        number_match = _RE_NUM_LIST.match(stripped)
+        if number_match:
+            number_part = number_match.group(1)
+            return colorize(number_part, Colors.BRIGHT_YELLOW) + ' ' + stripped[len(number_part):].lstrip()
         else:
             return formatted_text
     
     def _format_code_block(self, text: str) -> str:
         """Format code blocks."""
-        if '```' in text:
-            parts = text.split('```')
-            formatted_parts = []
-            for i, part in enumerate(parts):
-                if i % 2 == 1:  # Code part
-                    # Apply syntax highlighting to code
-                    highlighted_code = self._apply_syntax_highlighting(part)
-                    formatted_parts.append(colorize(f"```{highlighted_code}```", Colors.BRIGHT_GREEN, background=Colors.DIM))
-                else:  # Regular text with emphasis
-                    formatted_parts.append(self.format_with_enhanced_emphasis(part))
-            return ''.join(formatted_parts)
-        else:
+        parts = text.split('```')
+        if len(parts) == 1:
             return colorize(text, Colors.BRIGHT_GREEN, Colors.DIM)
+        
+        formatted_parts = []
+        for i, part in enumerate(parts):
+            if i % 2 == 1:  # Code part
+                # Apply syntax highlighting to code
+                highlighted_code = self._apply_syntax_highlighting(part)
+                formatted_parts.append(colorize(f"```{highlighted_code}```", Colors.BRIGHT_GREEN, Colors.DIM))
+            else:  # Regular text with emphasis
+                formatted_parts.append(self.format_with_enhanced_emphasis(part))
+        return ''.join(formatted_parts)
     
     def _format_quote(self, text: str) -> str:
         """Format quoted text."""
@@ -180,19 +382,7 @@ class EnhancedFormatter:
     
     def _apply_syntax_highlighting(self, code: str) -> str:
         """Apply basic syntax highlighting to code."""
-        # Keywords
-        keywords = ['def', 'class', 'import', 'from', 'if', 'else', 'elif', 'for', 'while', 'try', 'except', 'return']
-        for keyword in keywords:
-            code = re.sub(rf'\b{keyword}\b', colorize(keyword, Colors.BRIGHT_MAGENTA, Colors.BOLD), code)
-        
-        # Strings
-        code = re.sub(r'"([^"]*)"', lambda m: colorize(f'"{m.group(1)}"', Colors.BRIGHT_GREEN), code)
-        code = re.sub(r"'([^']*)'", lambda m: colorize(f"'{m.group(1)}'", Colors.BRIGHT_GREEN), code)
-        
-        # Comments
-        code = re.sub(r'#.*$', lambda m: colorize(m.group(0), Colors.BRIGHT_BLACK, Colors.ITALIC), code, flags=re.MULTILINE)
-        
-        return code
+        return _highlight_code(code, color_printer.colors_enabled)
     
     def create_enhanced_response_display(self, response: str, query: str = None, title: str = "AI Response") -> str:
         """
@@ -203,27 +393,42 @@ class EnhancedFormatter:
             query (str): Original query
             title (str): Display title
             
+        Returns:
+            str: Enhanced formatted display
+        """
+        # The color state is part of the key since it changes the output
+        return self._display_cache(response, query, title, color_printer.colors_enabled)
+    
+    def clear_display_cache(self):
+        """Drop all cached response displays, e.g. after a configuration change."""
+        self._display_cache.cache_clear()
+    
+    def _render_response_display(self, response: str, query: str, title: str, colors_enabled: bool) -> str:
+        """
+        Render the enhanced display for a response; cached by create_enhanced_response_display.
+        
+        Args:
+            response (str): Response text
+            query (str): Original query
+            title (str): Display title
+            colors_enabled (bool): Global color state; selects the prebuilt header and footer
+            
         Returns:
             str: Enhanced formatted display
         """
         # Format the response with enhanced emphasis
         formatted_response = self.format_response_with_enhanced_emphasis(response)
         
-        # Create header
-        header_line = "═" * 70
-        header = colorize(header_line, Colors.BRIGHT_CYAN)
-        title_line = colorize(f"🤖 {title}", Colors.BRIGHT_CYAN, Colors.BOLD)
+        # Header and footer share the same prebuilt rule
+        rule, title_prefix, title_suffix, query_label, query_rule = _DISPLAY_CHROME[bool(colors_enabled)]
         
         # Create query context if provided
         query_section = ""
         if query:
-            query_section = f"\n{colorize('📝 Query:', Colors.BRIGHT_YELLOW, Colors.BOLD)} {colorize(query, Colors.YELLOW)}\n{colorize('─' * 70, Colors.BRIGHT_BLACK)}"
-        
-        # Create footer
-        footer = colorize(header_line, Colors.BRIGHT_CYAN)
+            query_section = f"\n{query_label} {colorize(query, Colors.YELLOW)}\n{query_rule}"
         
         # Combine all parts
-        return f"\n{header}\n{title_line}{query_section}\n\n{formatted_response}\n\n{footer}"
+        return f"\n{rule}\n{title_prefix}{title}{title_suffix}{query_section}\n\n{formatted_response}\n\n{rule}"
     
     def print_enhanced_response(self, response: str, query: str = None, title: str = "AI Response"):
         """Print response with enhanced formatting."""
@@ -9,6 +9,62 @@ import ollama
 from config import config
 from chromadb_manager import ChromaDBManager
 from rag_processor import RAGProcessor
+from ollama_http import get_sync_client
+
+
+# Prompt templates with formatting instructions, filled in with str.format
+ENHANCED_PROMPT_WITH_CONTEXT = """You are a helpful AI assistant. Please provide a well-structured, informative response based on the given context.
+
+**Context Information:**
+{context_data}
+
+**User Question:**
+{prompt}
+
+**Formatting Instructions:**
+- Use **bold text** for important terms, key concepts, and emphasis
+- Use *italic text* for definitions, explanations, and subtle emphasis
+- Use ***bold italic*** for critical information that needs maximum attention
+- Use `inline code` for technical terms, commands, or code snippets
+- Use bullet points (•) or numbered lists for structured information
+- Use headings (# ## ###) to organize longer responses
+- Use ==highlighted text== for warnings or special notes
+- Use > quotes for important citations or references
+
+**Content Instructions:**
+- Provide a clear, comprehensive answer based on the context
+- **Highlight important information** using appropriate formatting
+- If the context doesn't fully answer the question, mention what information might be missing
+- Be concise but thorough
+- Use examples when helpful
+- Make key points stand out with proper emphasis
+
+**Response:**"""
+
+ENHANCED_PROMPT_WITHOUT_CONTEXT = """You are a helpful AI assistant. Please provide a well-structured, informative response to the user's question.
+
+**User Question:**
+{prompt}
+
+**Formatting Instructions:**
+- Use **bold text** for important terms, key concepts, and emphasis
+- Use *italic text* for definitions, explanations, and subtle emphasis
+- Use ***bold italic*** for critical information that needs maximum attention
+- Use `inline code` for technical terms, commands, or code snippets
+- Use bullet points (•) or numbered lists for structured information
+- Use headings (# ## ###) to organize longer responses
+- Use ==highlighted text== for warnings or special notes
+- Use > quotes for important citations or references
+
+**Content Instructions:**
+- Provide a clear, comprehensive answer
+- **Highlight important information** using appropriate formatting
+- Be concise but thorough
+- Use examples when helpful
+- If you're not certain about something, mention it clearly
+- Make key points stand out with proper emphasis
+
+**Response:**"""
 
 
 class EnhancedRAGProcessor(RAGProcessor):
@@ -18,6 +74,8 @@ class EnhancedRAGProcessor(RAGProcessor):
                  embedding_model: str = None, generation_model: str = None):
         """Initialize enhanced RAG processor."""
         super().__init__(chromadb_manager, embedding_model, generation_model)
+        # Enhanced responses use different prompts, so they are cached separately
+        self._enhanced_response_cache = self._new_response_cache()
     
     def generate_enhanced_response(self, prompt: str, context_data: str = "") -> dict:
         """
@@ -25,7 +83,7 @@ class EnhancedRAGProcessor(RAGProcessor):
         
         Args:
             prompt (str): User prompt/query
-            context_data (str): Retrieved context data to include
+            context_data (str): Retrieved context data to include, or "" if none was found
             
         Returns:
             dict: Generated response or error dict
@@ -35,14 +93,15 @@ class EnhancedRAGProcessor(RAGProcessor):
                 print(f"Generating enhanced response using '{self.generation_model}'...")
             
             # Construct enhanced prompt with formatting instructions
-            if context_data and context_data != "No relevant information found.":
+            if context_data:
                 full_prompt = self._create_enhanced_prompt_with_context(prompt, context_data)
             else:
                 full_prompt = self._create_enhanced_prompt_without_context(prompt)
             
-            output = ollama.generate(
+            output = get_sync_client().generate(
                 model=self.generation_model,
-                prompt=full_prompt
+                prompt=full_prompt,
+                keep_alive=config.KEEP_ALIVE
             )
             
             response_text = output.get('response', 'No response generated.')
@@ -62,60 +121,11 @@ class EnhancedRAGProcessor(RAGProcessor):
     
     def _create_enhanced_prompt_with_context(self, prompt: str, context_data: str) -> str:
         """Create an enhanced prompt with context and formatting instructions."""
-        return f"""You are a helpful AI assistant. Please provide a well-structured, informative response based on the given context.
-
-**Context Information:**
-{context_data}
-
-**User Question:**
-{prompt}
-
-**Formatting Instructions:**
-- Use **bold text** for important terms, key concepts, and emphasis
-- Use *italic text* for definitions, explanations, and subtle emphasis
-- Use ***bold italic*** for critical information that needs maximum attention
-- Use `inline code` for technical terms, commands, or code snippets
-- Use bullet points (•) or numbered lists for structured information
-- Use headings (# ## ###) to organize longer responses
-- Use ==highlighted text== for warnings or special notes
-- Use > quotes for important citations or references
-
-**Content Instructions:**
-- Provide a clear, comprehensive answer based on the context
-- **Highlight important information** using appropriate formatting
-- If the context doesn't fully answer the question, mention what information might be missing
-- Be concise but thorough
-- Use examples when helpful
-- Make key points stand out with proper emphasis
-
-**Response:**"""
+        return ENHANCED_PROMPT_WITH_CONTEXT.format(context_data=context_data, prompt=prompt)
     
     def _create_enhanced_prompt_without_context(self, prompt: str) -> str:
         """Create an enhanced prompt without context but with formatting instructions."""
-        return f"""You are a helpful AI assistant. Please provide a well-structured, informative response to the user's question.
-
-**User Question:**
-{prompt}
-
-**Formatting Instructions:**
-- Use **bold text** for important terms, key concepts, and emphasis
-- Use *italic text* for definitions, explanations, and subtle emphasis
-- Use ***bold italic*** for critical information that needs maximum attention
-- Use `inline code` for technical terms, commands, or code snippets
-- Use bullet points (•) or numbered lists for structured information
-- Use headings (# ## ###) to organize longer responses
-- Use ==highlighted text== for warnings or special notes
-- Use > quotes for important citations or references
-
-**Content Instructions:**
-- Provide a clear, comprehensive answer
-- **Highlight important information** using appropriate formatting
-- Be concise but thorough
-- Use examples when helpful
-- If you're not certain about something, mention it clearly
-- Make key points stand out with proper emphasis
-
-**Response:**"""
+        return ENHANCED_PROMPT_WITHOUT_CONTEXT.format(prompt=prompt)
     
     def process_enhanced_query(self, query_prompt: str) -> str:
         """
@@ -128,34 +138,50 @@ class EnhancedRAGProcessor(RAGProcessor):
             str: The final enhanced response or error message
         """
         try:
-            if not query_prompt.strip():
+            query_prompt = self._prepare_query(query_prompt)
+            if not query_prompt:
                 return "Please enter a non-empty query."
             
             if config.VERBOSE_LOGGING:
                 print(f"\n--- Processing Enhanced Query: '{query_prompt}' ---")
             
-            # Use direct text-based retrieval with dynamic filtering (new approach)
-            retrieval_result = self.retrieve_relevant_documents(query_prompt)
+            # Answer repeated or near-duplicate queries from the response cache
+            query_embedding = None
+            if self._enhanced_response_cache is not None:
+                cached_response, query_embedding = self._get_cached_response(
+                    self._enhanced_response_cache, query_prompt
+                )
+                if cached_response is not None:
+                    return cached_response
+            
+            # Use direct text-based retrieval with dynamic filtering (new approach),
+            # reusing the embedding computed for the cache lookup
+            retrieval_result = self.retrieve_relevant_documents(query_prompt, precomputed_embedding=query_embedding)
             if "error" in retrieval_result:
                 return f"**Error:** {retrieval_result['error']}"
             
             # Generate enhanced response with context
             generation_result = self.generate_enhanced_response(
                 query_prompt, 
-                retrieval_result["retrieved_data"]
+                retrieval_result["retrieved_data"] if retrieval_result["has_context"] else ""
             )
             if "error" in generation_result:
                 return f"**Error:** {generation_result['error']}\n\n{generation_result.get('suggestion', '')}"
             
             # Add filtering information to response if in debug mode
             response = generation_result["response"]
-            if config.DISTANCE_DEBUG_MODE and retrieval_result.get('filtering_info'):
-                filtering_info = retrieval_result['filtering_info']
+            if config.DISTANCE_DEBUG_MODE:
+                filtering_info = retrieval_result.get('filtering_info') or {}
                 if filtering_info.get('filtering_enabled'):
-                    debug_info = f"\n\n**[Debug]** Filtering: {filtering_info.get('original_count', 0)} → {filtering_info.get('filtered_count', 0)} results"
-                    if filtering_info.get('best_distance') is not None:
-                        debug_info += f", Best match: {filtering_info['best_distance']:.4f}"
-                    response += debug_info
+                    best_distance = filtering_info.get('best_distance')
+                    best_match = f", Best match: {best_distance:.4f}" if best_distance is not None else ""
+                    response += (
+                        f"\n\n**[Debug]** Filtering: {filtering_info.get('original_count', 0)} → "
+                        f"{filtering_info.get('filtered_count', 0)} results{best_match}"
+                    )
+            
+            if self._enhanced_response_cache is not None:
+                self._enhanced_response_cache.put(query_prompt, query_embedding, response)
             
             return response
             
@@ -6,19 +6,39 @@ Provides helper functions for managing environment variables and configuration.
 
 import os
 import shutil
+import functools
+import operator
 from config import config
 
+# Settings that must be non-empty for the application to run
+_REQUIRED_CONFIGS = (
+    'CHROMA_DB_PATH',
+    'COLLECTION_NAME',
+    'EMBEDDING_MODEL',
+    'GENERATION_MODEL',
+    'SENTENCE_TRANSFORMER_MODEL',
+    'DEFAULT_FILE_PATH',
+)
+
+_get_required_configs = operator.attrgetter(*_REQUIRED_CONFIGS)
+
+@functools.lru_cache(maxsize=None)
+def _path_exists(path: str) -> bool:
+    """Check whether a path exists, stat-ing each distinct path only once."""
+    return os.path.exists(path)
+
 def create_env_from_example():
     """Create .env file from .env.example if it doesn't exist."""
     env_path = '.env'
     example_path = '.env.example'
     
-    if os.path.exists(env_path):
+    if _path_exists(env_path):
         print(f"✓ {env_path} already exists")
         return
     
-    if os.path.exists(example_path):
+    if _path_exists(example_path):
         shutil.copy2(example_path, env_path)
+        _path_exists.cache_clear()
         print(f"✓ Created {env_path} from {example_path}")
         print("  Please review and modify the values as needed.")
     else:
@@ -28,19 +48,11 @@ def validate_config():
     """Validate that all required configuration values are set."""
     print("=== Configuration Validation ===")
     
-    required_configs = [
-        'CHROMA_DB_PATH',
-        'COLLECTION_NAME',
-        'EMBEDDING_MODEL',
-        'GENERATION_MODEL',
-        'SENTENCE_TRANSFORMER_MODEL',
-        'DEFAULT_FILE_PATH'
-    ]
-    
+    # Fetch every required setting up front, then report on each
+    values = _get_required_configs(config)
     all_valid = True
     
-    for config_name in required_configs:
-        value = getattr(config, config_name, None)
+    for config_name, value in zip(_REQUIRED_CONFIGS, values):
         if value:
             print(f"✓ {config_name}: {value}")
         else:
@@ -59,13 +71,13 @@ def check_file_paths():
     print("\n=== File Path Validation ===")
     
     # Check default file path
-    if os.path.exists(config.DEFAULT_FILE_PATH):
+    if _path_exists(config.DEFAULT_FILE_PATH):
         print(f"✓ Default file exists: {config.DEFAULT_FILE_PATH}")
     else:
         print(f"✗ Default file not found: {config.DEFAULT_FILE_PATH}")
     
     # Check ChromaDB path
-    if os.path.exists(config.CHROMA_DB_PATH):
+    if _path_exists(config.CHROMA_DB_PATH):
         print(f"✓ ChromaDB path exists: {config.CHROMA_DB_PATH}")
     else:
         print(f"⚠ ChromaDB path doesn't exist (will be created): {config.CHROMA_DB_PATH}")
@@ -75,7 +87,7 @@ def print_environment_status():
     print("=== MyAI Environment Status ===")
     
     # Check .env file
-    if os.path.exists('.env'):
+    if _path_exists('.env'):
         print("✓ .env file exists")
     else:
         print("✗ .env file not found")
@@ -8,17 +8,120 @@ This module handles all interactive commands for the RAG system:
 - Command parsing and validation
 """
 
+import io
+import sys
+import time
+from types import MappingProxyType
+from typing import Optional, Tuple
 from chromadb_manager import ChromaDBManager
 from config import config
 from colors import (
     Colors, print_success, print_error, print_warning, print_info,
-    print_header, print_subheader, print_command, print_dim, colorize
+    print_header, print_subheader, print_command, print_dim, colorize, color_printer
 )
 
 
+# Static messages, colorized once at import with the process-wide color setting
+_HELP_MESSAGE = '\n'.join([
+    colorize("\n📚 Available commands:", Colors.BRIGHT_CYAN, Colors.BOLD),
+    colorize("  /bye     ", Colors.BRIGHT_MAGENTA) + colorize("- Exit the program", Colors.WHITE),
+    colorize("  /context ", Colors.BRIGHT_MAGENTA) + colorize("- Add multi-line context to ChromaDB", Colors.WHITE),
+    colorize("  /clear   ", Colors.BRIGHT_MAGENTA) + colorize("- Clear all documents from ChromaDB", Colors.WHITE),
+    colorize("  /model   ", Colors.BRIGHT_MAGENTA) + colorize("- Switch LLM model (gemma3:4b/mistral:7b)", Colors.WHITE),
+    colorize("  /info    ", Colors.BRIGHT_MAGENTA) + colorize("- Show system information", Colors.WHITE),
+    colorize("  /help    ", Colors.BRIGHT_MAGENTA) + colorize("- Show this help message", Colors.WHITE),
+    "",
+    colorize("💬 Or enter any query to get an AI response based on your stored context.", Colors.BRIGHT_BLUE)
+])
+
+# Same text and colors as print_header/print_subheader/print_info would produce
+_STARTUP_HELP_LINES = (
+    colorize("\n🚀 RAG Interactive Mode", Colors.BRIGHT_CYAN, Colors.BOLD),
+    colorize("Available commands:", Colors.CYAN),
+    colorize("  /bye     ", Colors.BRIGHT_MAGENTA) + colorize("- Exit the program", Colors.WHITE),
+    colorize("  /context ", Colors.BRIGHT_MAGENTA) + colorize("- Add multi-line context to ChromaDB", Colors.WHITE),
+    colorize("  /clear   ", Colors.BRIGHT_MAGENTA) + colorize("- Clear all documents from ChromaDB", Colors.WHITE),
+    colorize("  /model   ", Colors.BRIGHT_MAGENTA) + colorize("- Switch LLM model (gemma3:4b/llama3.2)", Colors.WHITE),
+    colorize("  /info    ", Colors.BRIGHT_MAGENTA) + colorize("- Show system information", Colors.WHITE),
+    colorize("  /help    ", Colors.BRIGHT_MAGENTA) + colorize("- Show this help message", Colors.WHITE),
+    colorize("ℹ️  Enter your queries or use commands above.", Colors.BRIGHT_BLUE),
+)
+
+_BYE_MESSAGE = colorize("👋 Exiting interactive mode. Goodbye!", Colors.BRIGHT_CYAN)
+_CONTEXT_RULE = colorize("=" * 50, Colors.CYAN)
+_PREVIEW_RULE = colorize("-" * 30, Colors.CYAN)
+_CONTEXT_CANCEL_MSG = colorize("❌ Context input cancelled.", Colors.YELLOW)
+_CLEAR_CANCEL_MSG = colorize("❌ Clear operation cancelled.", Colors.YELLOW)
+
+# Closes a value colored with one of the /info label prefixes below
+_RESET = Colors.RESET if color_printer.colors_enabled else ''
+
+
+def _info_label(label: str, label_color: str, value_color: str) -> str:
+    """Colorize an /info label and append the escape code that colors its value."""
+    return colorize(label, label_color) + (value_color if color_printer.colors_enabled else '')
+
+
+_INFO_HEADER = colorize("🔧 System Information", Colors.BRIGHT_CYAN, Colors.BOLD) + '\n' + colorize("=" * 25, Colors.CYAN)
+
+_INFO_LABELS = {
+    'db_path': _info_label("📁 ChromaDB Path: ", Colors.BRIGHT_BLUE, Colors.WHITE),
+    'name': _info_label("📦 Collection Name: ", Colors.BRIGHT_BLUE, Colors.WHITE),
+    'count': _info_label("📊 Document Count: ", Colors.BRIGHT_BLUE, Colors.BRIGHT_WHITE),
+    'embedding_model': _info_label("🧠 Embedding Model: ", Colors.BRIGHT_GREEN, Colors.WHITE),
+    'generation_model': _info_label("🤖 Generation Model: ", Colors.BRIGHT_GREEN, Colors.BRIGHT_CYAN),
+    'sentence_transformer': _info_label("🔤 Sentence Transformer: ", Colors.BRIGHT_GREEN, Colors.WHITE),
+    'debug_mode': _info_label("🐛 Debug Mode: ", Colors.BRIGHT_YELLOW, Colors.WHITE),
+    'verbose_logging': _info_label("📝 Verbose Logging: ", Colors.BRIGHT_YELLOW, Colors.WHITE),
+}
+
+# Answers accepted by the y/N confirmation prompts
+_YES = frozenset({'y', 'yes'})
+
+
+def _confirm_yes(prompt: str) -> bool:
+    """
+    Ask a y/N question.
+
+    Args:
+        prompt (str): Prompt to show
+
+    Returns:
+        bool: True if the user answered y or yes (any case)
+    """
+    return input(prompt).strip().lower() in _YES
+
+
+# Seconds to reuse the list of pulled Ollama models between /model commands
+_MODELS_CACHE_TTL = 30.0
+
+# Map /model choices (menu numbers or model names) to model names
+_MODEL_MAP = MappingProxyType({
+    '1': 'gemma3:4b',
+    '2': 'mistral:7b',
+    '3': 'gemma3:27b',
+    '4': 'gemma3n:e4b',
+    'gemma3:27b': 'gemma3:27b',
+    'gemma3:4b': 'gemma3:4b',
+    'mistral:7b': 'mistral:7b',
+    'gemma3n:e4b': 'gemma3n:e4b'
+})
+
+
 class InteractiveCommands:
     """Handles interactive commands for the RAG system."""
 
+    # Command name -> handler method name, shared by all instances
+    _COMMAND_HANDLERS = MappingProxyType({
+        '/bye': '_handle_bye',
+        '/context': '_handle_context',
+        '/clear': '_handle_clear',
+        '/help': '_handle_help',
+        '/info': '_handle_info',
+        '/model': '_handle_model'
+    })
+    _COMMAND_NAMES = tuple(_COMMAND_HANDLERS)
+
     def __init__(self, chromadb_manager: ChromaDBManager, rag_processor=None):
         """
         Initialize interactive commands handler.
@@ -29,14 +132,8 @@ class InteractiveCommands:
         """
         self.chromadb_manager = chromadb_manager
         self.rag_processor = rag_processor
-        self.commands = {
-            '/bye': self._handle_bye,
-            '/context': self._handle_context,
-            '/clear': self._handle_clear,
-            '/help': self._handle_help,
-            '/info': self._handle_info,
-            '/model': self._handle_model
-        }
+        # (fetch time, set of model names) from the last model list call
+        self._models_cache: Tuple[float, Optional[set]] = (0.0, None)
 
     def is_command(self, user_input: str) -> bool:
         """
@@ -48,7 +145,8 @@ class InteractiveCommands:
         Returns:
             bool: True if input is a command, False otherwise
         """
-        return user_input.strip().startswith('/')
+        # Check the first character before falling back to copying the input without leading whitespace
+        return user_input[:1] == '/' or user_input.lstrip()[:1] == '/'
 
     def execute_command(self, command: str) -> dict:
         """
@@ -60,10 +158,12 @@ class InteractiveCommands:
         Returns:
             dict: Command execution result with 'action' and optional 'message'
         """
-        command = command.strip().lower()
+        command = command.strip()
 
-        if command in self.commands:
-            return self.commands[command]()
+        # Only the dispatch key is case-folded; the command text itself is left as typed
+        handler = type(self)._COMMAND_HANDLERS.get(command.lower())
+        if handler is not None:
+            return getattr(self, handler)()
         else:
             return {
                 'action': 'continue',
@@ -74,7 +174,7 @@ class InteractiveCommands:
         """Handle the /bye command."""
         return {
             'action': 'exit',
-            'message': colorize("👋 Exiting interactive mode. Goodbye!", Colors.BRIGHT_CYAN)
+            'message': _BYE_MESSAGE
         }
 
     def _handle_context(self) -> dict:
@@ -82,35 +182,40 @@ class InteractiveCommands:
         print_header("\n📝 Context Input Mode")
         print_info("Enter your multi-line context below.")
         print_dim("Type 'END' on a new line when finished, or 'CANCEL' to abort.")
-        print(colorize("=" * 50, Colors.CYAN))
+        print(_CONTEXT_RULE)
 
-        lines = []
-        while True:
-            try:
-                line = input()
-                if line.strip().upper() == 'END':
+        buffer = io.StringIO()
+        try:
+            # Read lines straight from stdin; input() flushes stdout and stderr
+            # for every line, which adds up on large pastes. End of input acts as END.
+            for line in iter(sys.stdin.readline, ''):
+                sentinel = line.strip().upper()
+                if sentinel == 'END':
                     break
-                elif line.strip().upper() == 'CANCEL':
+                elif sentinel == 'CANCEL':
                     return {
                         'action': 'continue',
-                        'message': colorize("❌ Context input cancelled.", Colors.YELLOW)
+                        'message': _CONTEXT_CANCEL_MSG
                     }
                 else:
-                    lines.append(line)
-            except KeyboardInterrupt:
-                return {
-                    'action': 'continue',
-                    'message': colorize("\n❌ Context input cancelled.", Colors.YELLOW)
-                }
+                    # Lines keep their newline, so the buffer holds the text as typed
+                    buffer.write(line)
+        except KeyboardInterrupt:
+            return {
+                'action': 'continue',
+                'message': "\n" + _CONTEXT_CANCEL_MSG
+            }
 
-        if not lines:
+        if not buffer.tell():
             return {
                 'action': 'continue',
                 'message': colorize("⚠️  No content entered. Context not saved.", Colors.YELLOW)
             }
 
-        # Join all lines into a single text block
-        context_text = '\n'.join(lines)
+        # Single text block without the last line's newline
+        context_text = buffer.getvalue()
+        if context_text.endswith('\n'):
+            context_text = context_text[:-1]
 
         # Show preview of what will be saved
         preview_length = 200
@@ -119,15 +224,14 @@ class InteractiveCommands:
             preview += "..."
 
         print_subheader(f"\n📋 Preview of context to be saved:")
-        print(colorize("-" * 30, Colors.CYAN))
+        print(_PREVIEW_RULE)
         print(preview)
-        print(colorize("-" * 30, Colors.CYAN))
-        print_info(f"Total length: {colorize(str(len(context_text)), Colors.BRIGHT_WHITE)} characters")
+        print(_PREVIEW_RULE)
+        print_info(f"Total length: {colorize(f'{len(context_text)}', Colors.BRIGHT_WHITE)} characters")
 
         # Confirm before saving
         confirm_prompt = colorize("\n💾 Save this context to ChromaDB? (y/N): ", Colors.BRIGHT_WHITE)
-        confirm = input(confirm_prompt).strip().lower()
-        if confirm in ['y', 'yes']:
+        if _confirm_yes(confirm_prompt):
             if self.chromadb_manager.add_context(context_text):
                 return {
                     'action': 'continue',
@@ -164,16 +268,15 @@ class InteractiveCommands:
                 }
 
             print_header(f"\n🗑️  Clear ChromaDB Collection")
-            print_info(f"Current collection contains {colorize(str(current_count), Colors.BRIGHT_WHITE)} document(s).")
+            print_info(f"Current collection contains {colorize(f'{current_count}', Colors.BRIGHT_WHITE)} document(s).")
             print_warning("This will permanently delete ALL documents from the collection!")
 
             # Double confirmation for safety
             confirm1_prompt = colorize(f"\n🤔 Are you sure you want to clear all context? (y/N): ", Colors.BRIGHT_WHITE)
-            confirm1 = input(confirm1_prompt).strip().lower()
-            if confirm1 not in ['y', 'yes']:
+            if not _confirm_yes(confirm1_prompt):
                 return {
                     'action': 'continue',
-                    'message': colorize("❌ Clear operation cancelled.", Colors.YELLOW)
+                    'message': _CLEAR_CANCEL_MSG
                 }
 
             confirm2_prompt = colorize("⚠️  This action cannot be undone. Type 'DELETE' to confirm: ", Colors.BRIGHT_RED)
@@ -181,7 +284,7 @@ class InteractiveCommands:
             if confirm2 != 'DELETE':
                 return {
                     'action': 'continue',
-                    'message': colorize("❌ Clear operation cancelled.", Colors.YELLOW)
+                    'message': _CLEAR_CANCEL_MSG
                 }
 
             # Perform the clear operation
@@ -204,21 +307,9 @@ class InteractiveCommands:
 
     def _handle_help(self) -> dict:
         """Handle the /help command."""
-        help_lines = [
-            colorize("\n📚 Available commands:", Colors.BRIGHT_CYAN, Colors.BOLD),
-            colorize("  /bye     ", Colors.BRIGHT_MAGENTA) + colorize("- Exit the program", Colors.WHITE),
-            colorize("  /context ", Colors.BRIGHT_MAGENTA) + colorize("- Add multi-line context to ChromaDB", Colors.WHITE),
-            colorize("  /clear   ", Colors.BRIGHT_MAGENTA) + colorize("- Clear all documents from ChromaDB", Colors.WHITE),
-            colorize("  /model   ", Colors.BRIGHT_MAGENTA) + colorize("- Switch LLM model (gemma3:4b/mistral:7b)", Colors.WHITE),
-            colorize("  /info    ", Colors.BRIGHT_MAGENTA) + colorize("- Show system information", Colors.WHITE),
-            colorize("  /help    ", Colors.BRIGHT_MAGENTA) + colorize("- Show this help message", Colors.WHITE),
-            "",
-            colorize("💬 Or enter any query to get an AI response based on your stored context.", Colors.BRIGHT_BLUE)
-        ]
-
         return {
             'action': 'continue',
-            'message': '\n'.join(help_lines)
+            'message': _HELP_MESSAGE
         }
 
     def _handle_model(self) -> dict:
@@ -249,25 +340,13 @@ class InteractiveCommands:
                     'message': colorize("❌ Model switching cancelled.", Colors.YELLOW)
                 }
 
-            # Map choices to model names
-            model_map = {
-                '1': 'gemma3:4b',
-                '2': 'mistral:7b',
-                '3': 'gemma3:27b',
-                '4': 'gemma3n:e4b',
-                'gemma3:27b': 'gemma3:27b',
-                'gemma3:4b': 'gemma3:4b',
-                'mistral:7b': 'mistral:7b',
-                'gemma3n:e4b': 'gemma3n:e4b'
-            }
-
-            if choice not in model_map:
+            if choice not in _MODEL_MAP:
                 return {
                     'action': 'continue',
                     'message': colorize(f"❌ Invalid choice: {choice}. Please choose 1-2 or a valid model name.", Colors.BRIGHT_RED)
                 }
 
-            new_model = model_map[choice]
+            new_model = _MODEL_MAP[choice]
 
             # Check if it's the same model
             if new_model == current_model:
@@ -278,9 +357,7 @@ class InteractiveCommands:
 
             # Confirm the switch
             confirm_prompt = colorize(f"\n🔄 Switch from '{current_model}' to '{new_model}'? (y/N): ", Colors.BRIGHT_WHITE)
-            confirm = input(confirm_prompt).strip().lower()
-
-            if confirm not in ['y', 'yes']:
+            if not _confirm_yes(confirm_prompt):
                 return {
                     'action': 'continue',
                     'message': colorize("❌ Model switch cancelled.", Colors.YELLOW)
@@ -292,12 +369,12 @@ class InteractiveCommands:
 
             # Test the new model by checking if it's available
             try:
-                import ollama
-                # Try to get model info to verify it exists
-                models = ollama.list()
-                available_models = [model['name'] for model in models.get('models', [])]
+                available_models = self._get_available_models()
 
-                if not any(new_model in model_name for model_name in available_models):
+                # Exact names are the common case; fall back to a substring scan for tagged variants
+                if new_model not in available_models and not any(
+                    new_model in model_name for model_name in available_models
+                ):
                     print_warning(f"⚠️  Model '{new_model}' may not be pulled yet.")
                     print_info(f"You may need to run: ollama pull {new_model}")
 
@@ -320,6 +397,22 @@ class InteractiveCommands:
                 'message': colorize(f"❌ Error during model switching: {e}", Colors.BRIGHT_RED)
             }
 
+    def _get_available_models(self) -> set:
+        """
+        Get the names of the models pulled into Ollama, reusing a recent result.
+
+        Returns:
+            set: Model names, refreshed at most every _MODELS_CACHE_TTL seconds
+        """
+        fetched_at, available_models = self._models_cache
+        now = time.monotonic()
+        if available_models is None or now - fetched_at >= _MODELS_CACHE_TTL:
+            from ollama_http import get_sync_client
+            models = get_sync_client().list()
+            available_models = {model['name'] for model in models.get('models', [])}
+            self._models_cache = (now, available_models)
+        return available_models
+
     def _handle_info(self) -> dict:
         """Handle the /info command to show system information."""
         try:
@@ -334,16 +427,15 @@ class InteractiveCommands:
                 current_embedding_model = getattr(self.rag_processor, 'embedding_model', config.EMBEDDING_MODEL)
 
             info_lines = [
-                colorize("🔧 System Information", Colors.BRIGHT_CYAN, Colors.BOLD),
-                colorize("=" * 25, Colors.CYAN),
-                colorize("📁 ChromaDB Path: ", Colors.BRIGHT_BLUE) + colorize(str(collection_info.get('db_path', 'Unknown')), Colors.WHITE),
-                colorize("📦 Collection Name: ", Colors.BRIGHT_BLUE) + colorize(str(collection_info.get('name', 'Unknown')), Colors.WHITE),
-                colorize("📊 Document Count: ", Colors.BRIGHT_BLUE) + colorize(str(collection_info.get('count', 'Unknown')), Colors.BRIGHT_WHITE),
-                colorize("🧠 Embedding Model: ", Colors.BRIGHT_GREEN) + colorize(current_embedding_model, Colors.WHITE),
-                colorize("🤖 Generation Model: ", Colors.BRIGHT_GREEN) + colorize(current_generation_model, Colors.BRIGHT_CYAN),
-                colorize("🔤 Sentence Transformer: ", Colors.BRIGHT_GREEN) + colorize(config.SENTENCE_TRANSFORMER_MODEL, Colors.WHITE),
-                colorize("🐛 Debug Mode: ", Colors.BRIGHT_YELLOW) + colorize(str(config.DEBUG_MODE), Colors.WHITE),
-                colorize("📝 Verbose Logging: ", Colors.BRIGHT_YELLOW) + colorize(str(config.VERBOSE_LOGGING), Colors.WHITE)
+                _INFO_HEADER,
+                f"{_INFO_LABELS['db_path']}{collection_info.get('db_path', 'Unknown')}{_RESET}",
+                f"{_INFO_LABELS['name']}{collection_info.get('name', 'Unknown')}{_RESET}",
+                f"{_INFO_LABELS['count']}{collection_info.get('count', 'Unknown')}{_RESET}",
+                f"{_INFO_LABELS['embedding_model']}{current_embedding_model}{_RESET}",
+                f"{_INFO_LABELS['generation_model']}{current_generation_model}{_RESET}",
+                f"{_INFO_LABELS['sentence_transformer']}{config.SENTENCE_TRANSFORMER_MODEL}{_RESET}",
+                f"{_INFO_LABELS['debug_mode']}{config.DEBUG_MODE}{_RESET}",
+                f"{_INFO_LABELS['verbose_logging']}{config.VERBOSE_LOGGING}{_RESET}"
             ]
 
             if "error" in collection_info:
@@ -360,27 +452,22 @@ class InteractiveCommands:
                 'message': colorize(f"❌ Error getting system information: {e}", Colors.BRIGHT_RED)
             }
 
-    def get_available_commands(self) -> list:
+    def get_available_commands(self) -> tuple:
         """
-        Get list of available commands.
+        Get available commands.
 
         Returns:
-            list: List of available command names
+            tuple: Available command names
         """
-        return list(self.commands.keys())
+        return self._COMMAND_NAMES
 
     def print_startup_help(self):
         """Print startup help message."""
-        print_header("\n🚀 RAG Interactive Mode")
-        print_subheader("Available commands:")
-        print(colorize("  /bye     ", Colors.BRIGHT_MAGENTA) + colorize("- Exit the program", Colors.WHITE))
-        print(colorize("  /context ", Colors.BRIGHT_MAGENTA) + colorize("- Add multi-line context to ChromaDB", Colors.WHITE))
-        print(colorize("  /clear   ", Colors.BRIGHT_MAGENTA) + colorize("- Clear all documents from ChromaDB", Colors.WHITE))
-        print(colorize("  /model   ", Colors.BRIGHT_MAGENTA) + colorize("- Switch LLM model (gemma3:4b/llama3.2)", Colors.WHITE))
-        print(colorize("  /info    ", Colors.BRIGHT_MAGENTA) + colorize("- Show system information", Colors.WHITE))
-        print(colorize("  /help    ", Colors.BRIGHT_MAGENTA) + colorize("- Show this help message", Colors.WHITE))
-        print_info("Enter your queries or use commands above.")
-
+        lines = list(_STARTUP_HELP_LINES)
         if config.DEBUG_MODE:
-            print_dim(f"Using embedding model: {config.EMBEDDING_MODEL}")
-            print_dim(f"Using generation model: {config.GENERATION_MODEL}")
+            lines.append(colorize(f"Using embedding model: {config.EMBEDDING_MODEL}", Colors.BRIGHT_BLACK))
+            lines.append(colorize(f"Using generation model: {config.GENERATION_MODEL}", Colors.BRIGHT_BLACK))
+
+        # One write instead of a print() per line
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
@@ -0,0 +1,156 @@
+"""
+Ollama Batching Module
+
+This module coalesces concurrent embedding requests into batched Ollama calls:
+- Requests arriving within a short window are grouped per model
+- Each group is sent as one /api/embed request with a list input
+- Sync and async callers share the same background event loop
+"""
+
+import atexit
+import asyncio
+import threading
+from ollama_http import OllamaAsyncClient
+
+
+# Maximum number of texts sent in a single embed request
+EMBED_MAX_BATCH_SIZE = 32
+
+# Seconds to wait for more requests after the first one of a batch arrives
+EMBED_BATCH_WINDOW = 0.01
+
+
+class EmbeddingBatcher:
+    """Micro-batches embedding requests on a background asyncio event loop."""
+
+    def __init__(self, max_batch_size: int = EMBED_MAX_BATCH_SIZE, batch_window: float = EMBED_BATCH_WINDOW):
+        """
+        Initialize the batcher. The event loop thread is started on first use.
+
+        Args:
+            max_batch_size (int): Maximum number of texts per embed request
+            batch_window (float): Seconds to collect further requests into a batch
+        """
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self._loop = None
+        self._queue = None
+        self._consumer = None
+        self._http = None
+        self._start_lock = threading.Lock()
+
+    def embed(self, model: str, text: str) -> list:
+        """
+        Embed a single text, blocking until its batch has been processed.
+
+        Args:
+            model (str): Ollama embedding model
+            text (str): Text to embed
+
+        Returns:
+            list: Embedding vector for the text
+        """
+        return asyncio.run_coroutine_threadsafe(self._submit(model, text), self._ensure_loop()).result()
+
+    async def aembed(self, model: str, text: str) -> list:
+        """
+        Embed a single text from any event loop.
+
+        Args:
+            model (str): Ollama embedding model
+            text (str): Text to embed
+
+        Returns:
+            list: Embedding vector for the text
+        """
+        future = asyncio.run_coroutine_threadsafe(self._submit(model, text), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop and batch consumer if not running yet."""
+        if self._loop is None:
+            with self._start_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="ollama-embed-batcher", daemon=True).start()
+                    asyncio.run_coroutine_threadsafe(self._start_consumer(), loop).result()
+                    self._loop = loop
+        return self._loop
+
+    async def _start_consumer(self):
+        """Create the request queue, HTTP client and consumer task on the batcher's loop."""
+        self._queue = asyncio.Queue()
+        # The pooled client is bound to this loop, so it lives and dies with it
+        self._http = OllamaAsyncClient()
+        self._consumer = asyncio.get_running_loop().create_task(self._consume())
+
+    def close(self):
+        """Stop the consumer and the background event loop, if started."""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stop_consumer(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+    async def _stop_consumer(self):
+        """Cancel the consumer task and close the HTTP client on the batcher's loop."""
+        self._consumer.cancel()
+        try:
+            await self._consumer
+        except asyncio.CancelledError:
+            pass
+        await self._http.aclose()
+
+    async def _submit(self, model: str, text: str) -> list:
+        """Queue a request on the batcher's loop and wait for its embedding."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((model, text, future))
+        return await future
+
+    async def _consume(self):
+        """Collect queued requests into batches and embed each batch with one call."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests for different models cannot share a call
+            by_model = {}
+            for model, text, future in batch:
+                by_model.setdefault(model, []).append((text, future))
+            for model, requests in by_model.items():
+                await self._embed_batch(model, requests)
+
+    async def _embed_batch(self, model: str, requests: list):
+        """
+        Embed one batch of texts and resolve each request's future.
+
+        Args:
+            model (str): Ollama embedding model
+            requests (list): (text, future) pairs
+        """
+        try:
+            response = await self._http.embed(model, [text for text, _ in requests])
+            embeddings = response['embeddings']
+        except Exception as e:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(requests, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+
+# Shared batcher so concurrent callers across processors are coalesced together
+embedding_batcher = EmbeddingBatcher()
+atexit.register(embedding_batcher.close)
@@ -0,0 +1,125 @@
+"""
+Ollama HTTP Module
+
+This module provides the Ollama clients used by the application, both bound
+to config.OLLAMA_HOST rather than the environment seen when ollama is imported.
+
+The async client talks to the Ollama REST API over a pooled httpx.AsyncClient:
+- Keep-alive connections are reused across embedding and generation calls
+- Models are kept loaded between requests for config.KEEP_ALIVE
+- HTTP errors are raised as ollama.ResponseError, like the ollama client does
+
+orjson is optional; when it is installed it encodes requests and decodes the
+responses (mostly long lists of embedding floats) instead of the json module.
+"""
+
+import httpx
+import ollama
+from config import config
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+
+# Connection pool limits for the shared client
+MAX_KEEPALIVE_CONNECTIONS = 32
+MAX_CONNECTIONS = 64
+
+# Generation can take a long time; connecting to a local server should not
+REQUEST_TIMEOUT = 120.0
+CONNECT_TIMEOUT = 5.0
+
+
+# Shared synchronous client, created on first use
+_sync_client = None
+
+
+def get_sync_client() -> ollama.Client:
+    """
+    Get the shared synchronous ollama client for config.OLLAMA_HOST.
+
+    Returns:
+        ollama.Client: Client reusing one connection pool across calls
+    """
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = ollama.Client(host=config.OLLAMA_HOST)
+    return _sync_client
+
+
+class OllamaAsyncClient:
+    """Pooled async client for the Ollama /api/embed and /api/generate endpoints."""
+
+    def __init__(self, host: str = None):
+        """
+        Initialize the client. The underlying httpx.AsyncClient is only created
+        on the first request, and must then only be used from one event loop.
+
+        Args:
+            host (str): Ollama server URL. Uses config default if None.
+        """
+        self.host = host
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled httpx.AsyncClient on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.host or config.OLLAMA_HOST,
+                limits=httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                                    max_connections=MAX_CONNECTIONS),
+                timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+            )
+        return self._client
+
+    async def embed(self, model: str, input) -> dict:
+        """
+        Embed one text or a list of texts.
+
+        Args:
+            model (str): Ollama embedding model
+            input: Text or list of texts to embed
+
+        Returns:
+            dict: Ollama response with an 'embeddings' list
+        """
+        return await self._post("/api/embed", {"model": model, "input": input, "keep_alive": config.KEEP_ALIVE})
+
+    async def generate(self, model: str, prompt: str) -> dict:
+        """
+        Generate a complete (non-streamed) response.
+
+        Args:
+            model (str): Ollama generation model
+            prompt (str): Prompt to generate from
+
+        Returns:
+            dict: Ollama response with the generated text under 'response'
+        """
+        return await self._post("/api/generate", {
+            "model": model, "prompt": prompt, "stream": False, "keep_alive": config.KEEP_ALIVE
+        })
+
+    async def aclose(self):
+        """Close all pooled connections, if any were opened."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _post(self, path: str, payload: dict) -> dict:
+        """POST a JSON payload and return the decoded JSON response."""
+        client = self._get_client()
+        if HAVE_ORJSON:
+            response = await client.post(
+                path, content=orjson.dumps(payload), headers={"Content-Type": "application/json"}
+            )
+        else:
+            response = await client.post(path, json=payload)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise ollama.ResponseError(e.response.text, e.response.status_code) from None
+        return orjson.loads(response.content) if HAVE_ORJSON else response.json()
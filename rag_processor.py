@@ -8,14 +8,33 @@ This module handles the Retrieval-Augmented Generation (RAG) pipeline:
 - Response generation using Ollama
 """
 
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+from itertools import accumulate, chain
+from typing import Generator, Iterator
 import ollama
 from config import config
 from chromadb_manager import ChromaDBManager
+from response_cache import ResponseCache
+from ollama_batcher import embedding_batcher
+from ollama_http import OllamaAsyncClient, get_sync_client
+
+
+def _with_score(doc: str, distance: float) -> str:
+    """Prefix a retrieved document with its distance score."""
+    return f"[Score: {distance:.3f}] {doc}"
 
 
 class RAGProcessor:
     """Handles RAG (Retrieval-Augmented Generation) operations."""
     
+    # Prompt used when context was retrieved, filled in with str.format
+    _PROMPT_TEMPLATE = "Using this data: {context_data}. Respond to this prompt: {prompt}"
+    
     def __init__(self, chromadb_manager: ChromaDBManager, 
                  embedding_model: str = None, generation_model: str = None):
         """
@@ -29,6 +48,16 @@ class RAGProcessor:
         self.chromadb_manager = chromadb_manager
         self.embedding_model = embedding_model or config.EMBEDDING_MODEL
         self.generation_model = generation_model or config.GENERATION_MODEL
+        self._response_cache = self._new_response_cache()
+        # Pooled connections for the async API, opened on first use and bound to that event loop
+        self._http = OllamaAsyncClient()
+        # (model, text digest) -> embedding, least recently used first
+        self._embed_cache = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
+        self._speculation_pool = (
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculative-generate")
+            if config.SPECULATIVE_GENERATION else None
+        )
     
     def generate_embedding(self, text: str) -> dict:
         """
@@ -41,14 +70,16 @@ class RAGProcessor:
             dict: Ollama embedding response or error dict
         """
         try:
-            if config.VERBOSE_LOGGING:
-                print(f"Generating embedding for text using '{self.embedding_model}'...")
-            
-            response = ollama.embed(
-                model=self.embedding_model,
-                input=text
-            )
-            return response
+            key = self._embed_cache_key(text)
+            embedding = self._get_cached_embedding(key)
+            if embedding is None:
+                if config.VERBOSE_LOGGING:
+                    print(f"Generating embedding for text using '{self.embedding_model}'...")
+                
+                # Concurrent requests are coalesced into one batched embed request
+                embedding = embedding_batcher.embed(self.embedding_model, text)
+                self._cache_embedding(key, embedding)
+            return {"embeddings": [embedding]}
             
         except ollama.ResponseError as e:
             return {
@@ -58,24 +89,50 @@ class RAGProcessor:
         except Exception as e:
             return {"error": f"Unexpected error generating embedding: {e}"}
     
-    def retrieve_relevant_documents(self, query_text: str, n_results: int = None) -> dict:
+    def _embed_cache_key(self, text: str) -> tuple:
+        """Key an embedding by model and a digest of the exact text."""
+        return self.embedding_model, hashlib.blake2b(text.encode(), digest_size=16).digest()
+    
+    def _get_cached_embedding(self, key: tuple):
+        """Return the cached embedding for key, or None on a cache miss."""
+        with self._embed_cache_lock:
+            embedding = self._embed_cache.get(key)
+            if embedding is not None:
+                self._embed_cache.move_to_end(key)
+            return embedding
+    
+    def _cache_embedding(self, key: tuple, embedding: list):
+        """Cache an embedding, evicting the least recently used ones over config.EMBED_CACHE_MAX."""
+        with self._embed_cache_lock:
+            self._embed_cache[key] = embedding
+            while len(self._embed_cache) > config.EMBED_CACHE_MAX:
+                self._embed_cache.popitem(last=False)
+    
+    def retrieve_relevant_documents(self, query_text: str, n_results: int = None,
+                                    precomputed_embedding=None) -> dict:
         """
         Retrieve relevant documents from ChromaDB using dynamic distance filtering.
         
         Args:
             query_text (str): Text query to search for
             n_results (int): Number of results to return. Uses config default if None.
+            precomputed_embedding: Query embedding from chromadb_manager.embed_query, if already computed
             
         Returns:
             dict: Retrieved documents and metadata with filtering information
         """
+        # Settings read once per call rather than at each use below
+        verbose = config.VERBOSE_LOGGING
+        debug_distances = config.DISTANCE_DEBUG_MODE
+        max_length = config.MAX_RETRIEVED_DATA_LENGTH
+        
         try:
-            if config.VERBOSE_LOGGING:
+            if verbose:
                 print("Querying ChromaDB for relevant documents with dynamic filtering...")
             
             # Use dynamic distance filtering for improved accuracy
             results = self.chromadb_manager.query_with_dynamic_distance_filter(
-                query_text, n_results
+                query_text, n_results, precomputed_embedding
             )
             
             if "error" in results:
@@ -83,55 +140,58 @@ class RAGProcessor:
             
             # Process and limit retrieved data
             retrieved_data = "No relevant information found."
+            has_context = False
             filtering_info = results.get('filtering_info', {})
             
             # Check if results were rejected by hard distance threshold
             if filtering_info.get('rejected_by_hard_threshold'):
                 retrieved_data = "No relevant information found."
-                if config.VERBOSE_LOGGING:
+                if verbose:
                     print(f"All results rejected by hard distance threshold ({config.HARD_DISTANCE_THRESHOLD})")
                     print(f"Best available distance was: {filtering_info.get('best_distance', 'N/A'):.4f}")
             elif results and results.get('documents') and results['documents'][0]:
                 documents = results['documents'][0]
                 distances = results.get('distances', [[]])[0]
                 
-                # Combine multiple documents if available
-                combined_docs = []
-                total_length = 0
-                max_length = config.MAX_RETRIEVED_DATA_LENGTH
+                # Combine multiple documents if available: the prefix sums of their
+                # lengths give how many whole documents fit within max_length
+                cumulative_lengths = list(accumulate(map(len, documents)))
+                fit_count = bisect_right(cumulative_lengths, max_length)
+                combined_docs = documents[:fit_count]
                 
-                for i, doc in enumerate(documents):
-                    if total_length + len(doc) <= max_length:
-                        doc_with_score = doc
-                        if distances and i < len(distances) and config.DISTANCE_DEBUG_MODE:
-                            doc_with_score = f"[Score: {distances[i]:.3f}] {doc}"
-                        combined_docs.append(doc_with_score)
-                        total_length += len(doc)
-                    else:
-                        # Add partial document if there's meaningful space
-                        remaining_space = max_length - total_length
-                        if remaining_space > 100:
-                            partial_doc = doc[:remaining_space] + "..."
-                            if distances and i < len(distances) and config.DISTANCE_DEBUG_MODE:
-                                partial_doc = f"[Score: {distances[i]:.3f}] {partial_doc}"
-                            combined_docs.append(partial_doc)
-                        break
+                # Add partial document if there's meaningful space
+                if fit_count < len(documents):
+                    remaining_space = max_length - (cumulative_lengths[fit_count - 1] if fit_count else 0)
+                    if remaining_space > 100:
+                        combined_docs.append(documents[fit_count][:remaining_space] + "...")
                 
-                retrieved_data = "\n\n".join(combined_docs) if combined_docs else "No relevant information found."
+                # Scores are only formatted for the documents that were kept; any
+                # documents beyond the returned distances are left unscored
+                if distances and debug_distances:
+                    context_docs = chain(map(_with_score, combined_docs, distances), combined_docs[len(distances):])
+                else:
+                    context_docs = combined_docs
                 
-                if config.VERBOSE_LOGGING:
-                    print(f"Retrieved {len(combined_docs)} document(s)")
+                has_context = bool(combined_docs)
+                if has_context:
+                    retrieved_data = "\n\n".join(context_docs)
+                
+                # The summary is only formatted when it is shown, and written in one call
+                if verbose:
+                    log_lines = [f"Retrieved {len(combined_docs)} document(s)"]
                     if filtering_info.get('filtering_enabled'):
-                        print(f"Filtering: {filtering_info.get('original_count', 0)} → {filtering_info.get('filtered_count', 0)} results")
+                        log_lines.append(f"Filtering: {filtering_info.get('original_count', 0)} → {filtering_info.get('filtered_count', 0)} results")
                         if filtering_info.get('best_distance') is not None:
-                            print(f"Best match distance: {filtering_info['best_distance']:.4f}")
-                    print(f"Data snippet: '{retrieved_data[:100]}...'")
+                            log_lines.append(f"Best match distance: {filtering_info['best_distance']:.4f}")
+                    log_lines.append(f"Data snippet: '{retrieved_data[:100]}...'")
+                    print("\n".join(log_lines))
             else:
-                if config.VERBOSE_LOGGING:
+                if verbose:
                     print("No relevant documents found in the collection for this query.")
             
             return {
                 "retrieved_data": retrieved_data,
+                "has_context": has_context,
                 "raw_results": results,
                 "filtering_info": filtering_info,
                 "distances": results.get('distances', [[]])[0] if results.get('distances') else []
@@ -163,11 +223,13 @@ class RAGProcessor:
             
             # Process and limit retrieved data
             retrieved_data = "No relevant information found."
+            has_context = False
             if results and results.get('documents') and results['documents'][0]:
                 data = results['documents'][0][0]
                 # Limit the retrieved data to avoid excessively long prompts
                 max_length = config.MAX_RETRIEVED_DATA_LENGTH
                 retrieved_data = data if len(data) < max_length else data[:max_length] + "..."
+                has_context = bool(retrieved_data)
                 
                 if config.VERBOSE_LOGGING:
                     print(f"Retrieved data snippet: '{retrieved_data[:100]}...'")
@@ -177,19 +239,89 @@ class RAGProcessor:
             
             return {
                 "retrieved_data": retrieved_data,
+                "has_context": has_context,
                 "raw_results": results
             }
             
         except Exception as e:
             return {"error": f"Error retrieving documents: {e}"}
     
+    def generate_response_stream(self, prompt: str, context_data: str = "") -> Iterator[str]:
+        """
+        Generate response using Ollama with optional context data, yielding text
+        chunks as soon as the model decodes them.
+        
+        Args:
+            prompt (str): User prompt/query
+            context_data (str): Retrieved context data to include, or "" if none was found
+            
+        Returns:
+            Iterator[str]: Chunks of the generated response; iterating raises
+                ollama.ResponseError if Ollama rejects the request
+        """
+        if context_data:
+            return self._generate_with_context(prompt, context_data)
+        return self._generate_bare(prompt)
+    
+    def _generate_bare(self, prompt: str) -> Generator[str, None, None]:
+        """Stream a response to the prompt on its own."""
+        return self._stream_generation(prompt)
+    
+    def _generate_with_context(self, prompt: str, context_data: str) -> Generator[str, None, None]:
+        """Stream a response to the prompt with the retrieved context filled into the template."""
+        return self._stream_generation(self._PROMPT_TEMPLATE.format(context_data=context_data, prompt=prompt))
+    
+    def _stream_generation(self, full_prompt: str) -> Generator[str, None, None]:
+        """Yield the text chunks Ollama generates for the complete prompt."""
+        if config.VERBOSE_LOGGING:
+            print(f"Generating response using '{self.generation_model}'...")
+        
+        stream = get_sync_client().generate(
+            model=self.generation_model,
+            prompt=full_prompt,
+            stream=True,
+            keep_alive=config.KEEP_ALIVE
+        )
+        for chunk in stream:
+            yield chunk.get('response', '')
+    
     def generate_response(self, prompt: str, context_data: str = "") -> dict:
         """
         Generate response using Ollama with optional context data.
         
         Args:
             prompt (str): User prompt/query
-            context_data (str): Retrieved context data to include
+            context_data (str): Retrieved context data to include, or "" if none was found
+            
+        Returns:
+            dict: Generated response or error dict
+        """
+        try:
+            response_text = "".join(self.generate_response_stream(prompt, context_data))
+            return {
+                "response": response_text or 'No response generated.',
+                "full_prompt": self._build_prompt(prompt, context_data) if config.DEBUG_MODE else None
+            }
+            
+        except ollama.ResponseError as e:
+            return self._generation_error(e)
+        except Exception as e:
+            return {"error": f"Unexpected error generating response: {e}"}
+    
+    def _generation_error(self, error: Exception) -> dict:
+        """Build the error dict returned when Ollama rejects a generation request."""
+        return {
+            "error": f"Ollama generation error: {error}",
+            "suggestion": f"Please ensure Ollama server is running and model '{self.generation_model}' is pulled."
+        }
+    
+    async def agenerate_response(self, prompt: str, context_data: str = "") -> dict:
+        """
+        Generate response over the pooled HTTP connection with optional context data.
+        
+        Args:
+            prompt (str): User prompt/query
+            context_data (str): Retrieved context data to include, or "" if none was found
             
         Returns:
             dict: Generated response or error dict
@@ -198,16 +330,8 @@ class RAGProcessor:
             if config.VERBOSE_LOGGING:
                 print(f"Generating response using '{self.generation_model}'...")
             
-            # Construct full prompt with context
-            if context_data and context_data != "No relevant information found.":
-                full_prompt = f"Using this data: {context_data}. Respond to this prompt: {prompt}"
-            else:
-                full_prompt = prompt
-            
-            output = ollama.generate(
-                model=self.generation_model,
-                prompt=full_prompt
-            )
+            full_prompt = self._build_prompt(prompt, context_data)
+            output = await self._http.generate(self.generation_model, full_prompt)
             
             response_text = output.get('response', 'No response generated.')
             return {
@@ -216,13 +340,19 @@ class RAGProcessor:
             }
             
         except ollama.ResponseError as e:
-            return {
-                "error": f"Ollama generation error: {e}",
-                "suggestion": f"Please ensure Ollama server is running and model '{self.generation_model}' is pulled."
-            }
+            return self._generation_error(e)
         except Exception as e:
             return {"error": f"Unexpected error generating response: {e}"}
     
+    async def aclose(self):
+        """Close the pooled HTTP connections used by the async API."""
+        await self._http.aclose()
+    
+    @classmethod
+    def _build_prompt(cls, prompt: str, context_data: str) -> str:
+        """Construct the full prompt, including the context data if there is any."""
+        return cls._PROMPT_TEMPLATE.format(context_data=context_data, prompt=prompt) if context_data else prompt
+    
     def process_query(self, query_prompt: str) -> str:
         """
         Process a complete RAG query from start to finish with dynamic distance filtering.
@@ -233,44 +363,259 @@ class RAGProcessor:
         Returns:
             str: The final response or error message
         """
+        return "".join(self.process_query_stream(query_prompt))
+    
+    def process_query_stream(self, query_prompt: str) -> Iterator[str]:
+        """
+        Process a complete RAG query, yielding the response as it is generated.
+        
+        Args:
+            query_prompt (str): The user's query
+            
+        Yields:
+            str: Next chunk of the final response or error message
+        """
         try:
-            if not query_prompt.strip():
+            query_prompt = self._prepare_query(query_prompt)
+            if not query_prompt:
+                yield "Please enter a non-empty query."
+                return
+            
+            if config.VERBOSE_LOGGING:
+                print(f"\n--- Processing Query: '{query_prompt}' ---")
+            
+            # Answer repeated or near-duplicate queries from the response cache
+            query_embedding = None
+            if self._response_cache is not None:
+                cached_response, query_embedding = self._get_cached_response(self._response_cache, query_prompt)
+                if cached_response is not None:
+                    yield cached_response
+                    return
+            
+            # Speculatively answer without context while retrieval runs, in case
+            # nothing relevant is found
+            speculative = None
+            cancel_speculation = threading.Event()
+            if self._speculation_pool is not None:
+                speculative = self._speculation_pool.submit(self._speculative_generate, query_prompt, cancel_speculation)
+            
+            # However retrieval and generation end, the speculation must not keep running
+            try:
+                # Use direct text-based retrieval with dynamic filtering, reusing the
+                # embedding computed for the cache lookup
+                retrieval_result = self.retrieve_relevant_documents(query_prompt, precomputed_embedding=query_embedding)
+                if "error" in retrieval_result:
+                    yield self._format_error(retrieval_result)
+                    return
+                
+                # Stream the response with context, keeping the chunks for the cache
+                context_data = retrieval_result["retrieved_data"] if retrieval_result["has_context"] else ""
+                chunks = []
+                response_stream: Iterator[str]
+                try:
+                    if context_data:
+                        cancel_speculation.set()
+                        response_stream = self._generate_with_context(query_prompt, context_data)
+                    elif speculative is not None:
+                        # Without context the speculative answer is exactly what would be generated
+                        response_stream = iter((speculative.result(),))
+                    else:
+                        response_stream = self._generate_bare(query_prompt)
+                    for chunk in response_stream:
+                        chunks.append(chunk)
+                        yield chunk
+                except ollama.ResponseError as e:
+                    yield self._format_error(self._generation_error(e))
+                    return
+                except Exception as e:
+                    yield self._format_error({"error": f"Unexpected error generating response: {e}"})
+                    return
+            finally:
+                cancel_speculation.set()
+            
+            if not chunks:
+                chunks.append('No response generated.')
+                yield chunks[0]
+            
+            # Add filtering information to response if in debug mode
+            debug_info = self._distance_debug_info(retrieval_result)
+            if debug_info:
+                chunks.append(debug_info)
+                yield debug_info
+            
+            if self._response_cache is not None:
+                self._response_cache.put(query_prompt, query_embedding, "".join(chunks))
+            
+        except Exception as e:
+            yield f"An unexpected error occurred during RAG processing: {e}"
+    
+    async def process_query_async(self, query_prompt: str) -> str:
+        """
+        Process a complete RAG query without blocking the event loop, so many
+        queries can be in flight at once and share the pooled Ollama connections.
+        
+        ChromaDB and the sentence transformer run in worker threads; generation
+        uses the async HTTP client, so call this from a single event loop.
+        
+        Args:
+            query_prompt (str): The user's query
+            
+        Returns:
+            str: The final response or error message
+        """
+        try:
+            query_prompt = self._prepare_query(query_prompt)
+            if not query_prompt:
                 return "Please enter a non-empty query."
             
             if config.VERBOSE_LOGGING:
                 print(f"\n--- Processing Query: '{query_prompt}' ---")
             
-            # Use direct text-based retrieval with dynamic filtering
-            retrieval_result = self.retrieve_relevant_documents(query_prompt)
+            # Answer repeated or near-duplicate queries from the response cache
+            query_embedding = None
+            if self._response_cache is not None:
+                cached_response, query_embedding = await asyncio.to_thread(
+                    self._get_cached_response, self._response_cache, query_prompt
+                )
+                if cached_response is not None:
+                    return cached_response
+            
+            retrieval_result = await asyncio.to_thread(
+                self.retrieve_relevant_documents, query_prompt, precomputed_embedding=query_embedding
+            )
             if "error" in retrieval_result:
-                return f"Error: {retrieval_result['error']}"
+                return self._format_error(retrieval_result)
             
-            # Generate response with context
-            generation_result = self.generate_response(
-                query_prompt, 
-                retrieval_result["retrieved_data"]
-            )
+            context_data = retrieval_result["retrieved_data"] if retrieval_result["has_context"] else ""
+            generation_result = await self.agenerate_response(query_prompt, context_data)
             if "error" in generation_result:
-                return f"Error: {generation_result['error']}\n{generation_result.get('suggestion', '')}"
+                return self._format_error(generation_result)
             
             # Add filtering information to response if in debug mode
-            response = generation_result["response"]
-            if config.DISTANCE_DEBUG_MODE and retrieval_result.get('filtering_info'):
-                filtering_info = retrieval_result['filtering_info']
-                if filtering_info.get('rejected_by_hard_threshold'):
-                    debug_info = f"\n\n[Debug] Hard threshold rejection: {filtering_info.get('best_distance', 'N/A'):.4f} > {filtering_info.get('hard_threshold_value', 'N/A')}"
-                elif filtering_info.get('filtering_enabled'):
-                    debug_info = f"\n\n[Debug] Filtering: {filtering_info.get('original_count', 0)} → {filtering_info.get('filtered_count', 0)} results"
-                    if filtering_info.get('best_distance') is not None:
-                        debug_info += f", Best match: {filtering_info['best_distance']:.4f}"
-                    debug_info += f", Hard threshold: {filtering_info.get('hard_threshold_value', 'N/A')}"
-                    response += debug_info
+            response = generation_result["response"] + self._distance_debug_info(retrieval_result)
+            
+            if self._response_cache is not None:
+                self._response_cache.put(query_prompt, query_embedding, response)
             
             return response
             
         except Exception as e:
             return f"An unexpected error occurred during RAG processing: {e}"
     
+    @staticmethod
+    def _format_error(result: dict) -> str:
+        """Format an error dict, and its suggestion if there is one, as a response."""
+        if result.get('suggestion'):
+            return f"Error: {result['error']}\n{result['suggestion']}"
+        return f"Error: {result['error']}"
+    
+    @staticmethod
+    def _distance_debug_info(retrieval_result: dict) -> str:
+        """
+        Describe the distance filtering applied to a retrieval in debug mode.
+        
+        Args:
+            retrieval_result (dict): Result of retrieve_relevant_documents
+            
+        Returns:
+            str: Debug suffix for the response, or "" if there is nothing to add
+        """
+        filtering_info = retrieval_result.get('filtering_info')
+        if not (config.DISTANCE_DEBUG_MODE and filtering_info):
+            return ""
+        
+        best_distance = filtering_info.get('best_distance')
+        hard_threshold = filtering_info.get('hard_threshold_value', 'N/A')
+        if filtering_info.get('rejected_by_hard_threshold'):
+            return f"\n\n[Debug] Hard threshold rejection: {best_distance:.4f} > {hard_threshold}"
+        if filtering_info.get('filtering_enabled'):
+            best_match = f", Best match: {best_distance:.4f}" if best_distance is not None else ""
+            return (
+                f"\n\n[Debug] Filtering: {filtering_info.get('original_count', 0)} → "
+                f"{filtering_info.get('filtered_count', 0)} results{best_match}, Hard threshold: {hard_threshold}"
+            )
+        return ""
+    
+    @staticmethod
+    def _prepare_query(query_prompt: str) -> str:
+        """
+        Strip the query and truncate it to config.MAX_QUERY_LEN characters, so an
+        oversized input cannot cause a huge prompt evaluation in Ollama.
+        
+        Args:
+            query_prompt (str): The user's query
+            
+        Returns:
+            str: The query to process, empty if there is nothing to process
+        """
+        query_prompt = query_prompt.strip()
+        if len(query_prompt) > config.MAX_QUERY_LEN:
+            if config.VERBOSE_LOGGING:
+                print(f"Query truncated from {len(query_prompt)} to {config.MAX_QUERY_LEN} characters.")
+            query_prompt = query_prompt[:config.MAX_QUERY_LEN]
+        return query_prompt
+    
+    def _speculative_generate(self, query_prompt: str, cancelled: threading.Event):
+        """
+        Generate a response without context, stopping early once cancelled.
+        
+        Closing the stream drops the connection, which makes Ollama stop decoding.
+        
+        Args:
+            query_prompt (str): The user's query
+            cancelled (threading.Event): Set when the response is no longer needed
+            
+        Returns:
+            str: The generated response, or None if cancelled
+        """
+        stream = self._generate_bare(query_prompt)
+        try:
+            chunks = []
+            for chunk in stream:
+                if cancelled.is_set():
+                    return None
+                chunks.append(chunk)
+            return "".join(chunks)
+        finally:
+            stream.close()
+    
+    @staticmethod
+    def _new_response_cache():
+        """
+        Create a response cache from the configuration.
+        
+        Returns:
+            ResponseCache: New empty cache, or None if response caching is disabled
+        """
+        if not config.ENABLE_RESPONSE_CACHE or config.RESPONSE_CACHE_MAX_ENTRIES <= 0:
+            return None
+        return ResponseCache(config.RESPONSE_CACHE_MAX_ENTRIES, config.RESPONSE_CACHE_SIMILARITY)
+    
+    def _get_cached_response(self, response_cache: ResponseCache, query_prompt: str) -> tuple:
+        """
+        Look up a cached response for the query, exact match first, then by embedding.
+        
+        Args:
+            response_cache (ResponseCache): Cache of the pipeline answering the query
+            query_prompt (str): The user's query
+            
+        Returns:
+            tuple: (cached response or None, query embedding or None if not computed)
+        """
+        # Cached responses are only valid for the current model and collection contents
+        response_cache.set_scope((self.generation_model, self.chromadb_manager.data_version))
+        
+        cached_response = response_cache.get(query_prompt)
+        query_embedding = None
+        if cached_response is None:
+            query_embedding = self.chromadb_manager.embed_query(query_prompt)
+            if query_embedding is not None:
+                cached_response = response_cache.get_similar(query_embedding)
+        
+        if cached_response is not None and config.VERBOSE_LOGGING:
+            print("Returning cached response.")
+        return cached_response, query_embedding
+    
     def process_query_legacy(self, query_prompt: str) -> str:
         """
         Legacy method: Process a complete RAG query using embedding-based retrieval.
@@ -283,7 +628,8 @@ class RAGProcessor:
             str: The final response or error message
         """
         try:
-            if not query_prompt.strip():
+            query_prompt = self._prepare_query(query_prompt)
+            if not query_prompt:
                 return "Please enter a non-empty query."
             
             if config.VERBOSE_LOGGING:
@@ -292,28 +638,48 @@ class RAGProcessor:
             # Step 1: Generate embedding for the query
             embedding_result = self.generate_embedding(query_prompt)
             if "error" in embedding_result:
-                return f"Error: {embedding_result['error']}\n{embedding_result.get('suggestion', '')}"
+                return self._format_error(embedding_result)
             
             # Step 2: Retrieve relevant documents using embeddings
             retrieval_result = self.retrieve_relevant_documents_legacy(
                 embedding_result["embeddings"]
             )
             if "error" in retrieval_result:
-                return f"Error: {retrieval_result['error']}"
+                return self._format_error(retrieval_result)
             
             # Step 3: Generate response with context
             generation_result = self.generate_response(
                 query_prompt, 
-                retrieval_result["retrieved_data"]
+                retrieval_result["retrieved_data"] if retrieval_result["has_context"] else ""
             )
             if "error" in generation_result:
-                return f"Error: {generation_result['error']}\n{generation_result.get('suggestion', '')}"
+                return self._format_error(generation_result)
             
             return generation_result["response"]
             
         except Exception as e:
             return f"An unexpected error occurred during RAG processing: {e}"
     
+    def prewarm_generation_model(self):
+        """
+        Load the generation model into Ollama in the background, so the first
+        query does not pay the model load time.
+        
+        The Ollama embedding model is not preloaded: queries embed with the
+        sentence transformer, and only the legacy pipeline uses that model.
+        """
+        threading.Thread(target=self._load_generation_model, name="ollama-prewarm", daemon=True).start()
+    
+    def _load_generation_model(self):
+        """Send an empty prompt, which makes Ollama load the model for config.KEEP_ALIVE without generating."""
+        try:
+            get_sync_client().generate(model=self.generation_model, prompt="", keep_alive=config.KEEP_ALIVE)
+            if config.DEBUG_MODE:
+                print(f"Preloaded model '{self.generation_model}'")
+        except Exception as e:
+            if config.DEBUG_MODE:
+                print(f"Model preload failed: {e}")
+    
     def get_models_info(self) -> dict:
         """
         Get information about the models being used.
@@ -0,0 +1,212 @@
+"""
+Response Cache Module
+
+This module caches generated RAG responses so repeated queries can skip
+retrieval and generation entirely:
+- Exact matches on the normalized query text
+- Semantic matches on the query embedding (cosine similarity)
+
+Embeddings are stored quantized to int8 with one float32 scale per vector,
+a quarter of the memory of float32 vectors at a cosine error around 1e-3.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+# Rows allocated for embeddings on first use; the matrix doubles up to max_entries
+_INITIAL_CAPACITY = 64
+
+
+class ResponseCache:
+    """Two-tier (exact + semantic) LRU cache of query responses."""
+
+    def __init__(self, max_entries: int, similarity_threshold: float):
+        """
+        Initialize the response cache.
+
+        Args:
+            max_entries (int): Maximum number of cached responses
+            similarity_threshold (float): Minimum cosine similarity for a semantic hit
+        """
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        self._scope = None
+        # key -> (response, embedding row or None), least recently used first
+        self._entries = OrderedDict()
+        # int8 embedding rows and the float32 scale that dequantizes each row
+        self._vectors = None
+        self._scales = None
+        self._row_keys = []
+        self._free_rows = []
+
+    @staticmethod
+    def _key(query: str) -> str:
+        """Hash the normalized query text."""
+        return hashlib.sha1(query.strip().lower().encode()).hexdigest()
+
+    def set_scope(self, scope: tuple):
+        """
+        Set what the cached responses depend on, e.g. models and collection state.
+
+        Changing the scope drops every cached response.
+
+        Args:
+            scope (tuple): Hashable description of the current generation setup
+        """
+        with self._lock:
+            if scope != self._scope:
+                self._clear()
+                self._scope = scope
+
+    def get(self, query: str):
+        """
+        Look up a response cached for the same query text.
+
+        Args:
+            query (str): User query
+
+        Returns:
+            str: Cached response, or None on a cache miss
+        """
+        key = self._key(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get_similar(self, embedding):
+        """
+        Look up the response cached for the most similar query embedding.
+
+        Args:
+            embedding: Query embedding vector
+
+        Returns:
+            str: Cached response if the best match reaches the similarity threshold, otherwise None
+        """
+        query_vector, query_scale = self._quantize(embedding)
+        with self._lock:
+            if (self._vectors is None or self._vectors.shape[1] != query_vector.shape[0]
+                    or len(self._free_rows) == len(self._row_keys)):
+                return None
+
+            # Integer dot products, accumulated in int32, then rescaled to cosines
+            rows = len(self._row_keys)
+            dots = np.einsum('ij,j->i', self._vectors[:rows], query_vector, dtype=np.int32)
+            similarities = dots * self._scales[:rows] * query_scale
+            if self._free_rows:
+                similarities[self._free_rows] = -np.inf
+            best_row = int(similarities.argmax())
+            if similarities[best_row] < self.similarity_threshold:
+                return None
+
+            key = self._row_keys[best_row]
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, query: str, embedding, response: str):
+        """
+        Cache a response, evicting the least recently used entries over the limit.
+
+        Args:
+            query (str): User query
+            embedding: Query embedding vector, or None to only cache the exact query
+            response (str): Response to cache
+        """
+        if self.max_entries <= 0:
+            return
+        key = self._key(query)
+        quantized = self._quantize(embedding) if embedding is not None else None
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._release_row(old_entry[1])
+
+            # Make room first so the embedding matrix never needs more than max_entries rows
+            while self._entries and len(self._entries) >= self.max_entries:
+                _, (_, evicted_row) = self._entries.popitem(last=False)
+                self._release_row(evicted_row)
+
+            row = self._store_vector(key, *quantized) if quantized is not None else None
+            self._entries[key] = (response, row)
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            self._clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _clear(self):
+        """Drop all cached responses; the caller holds the lock."""
+        self._entries.clear()
+        self._vectors = None
+        self._scales = None
+        self._row_keys = []
+        self._free_rows = []
+
+    @staticmethod
+    def _quantize(embedding) -> tuple:
+        """
+        Normalize an embedding to unit length and quantize it to int8.
+
+        Returns:
+            tuple: (int8 vector, float32 scale) with vector * scale ~= the unit vector
+        """
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        peak = np.abs(vector).max() / norm if norm else 0.0
+        if not peak:
+            return np.zeros(vector.shape, dtype=np.int8), np.float32(0.0)
+        scale = np.float32(peak / 127)
+        return np.round(vector / (norm * scale)).astype(np.int8), scale
+
+    def _store_vector(self, key: str, vector: np.ndarray, scale: np.float32) -> int:
+        """
+        Store a quantized embedding in a free row of the matrix; the caller holds the lock.
+
+        Returns:
+            int: Row the embedding was stored in
+        """
+        if self._vectors is not None and self._vectors.shape[1] != vector.shape[0]:
+            # Embedding size changed, so no earlier vector is comparable
+            for entry_key, (response, _) in self._entries.items():
+                self._entries[entry_key] = (response, None)
+            self._vectors = None
+            self._scales = None
+            self._row_keys = []
+            self._free_rows = []
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._row_keys[row] = key
+        else:
+            row = len(self._row_keys)
+            if self._vectors is None:
+                capacity = min(_INITIAL_CAPACITY, self.max_entries)
+                self._vectors = np.empty((capacity, vector.shape[0]), dtype=np.int8)
+                self._scales = np.empty(capacity, dtype=np.float32)
+            elif row == self._vectors.shape[0]:
+                capacity = min(row * 2, self.max_entries)
+                grown = np.empty((capacity, vector.shape[0]), dtype=np.int8)
+                grown[:row] = self._vectors
+                self._vectors = grown
+                self._scales = np.resize(self._scales, capacity)
+            self._row_keys.append(key)
+
+        self._vectors[row] = vector
+        self._scales[row] = scale
+        return row
+
+    def _release_row(self, row):
+        """Mark an embedding row as free; the caller holds the lock."""
+        if row is not None:
+            self._row_keys[row] = None
+            self._free_rows.append(row)